@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The api module is the entry point for using the program as a library,
+without main.py. matplotlib is set to the backend Agg, so graphs are only
+saved and never shown, and it is only imported if do_graph is set. SciPy is
+only imported by the integration modes which need it.
+Example:
+    from api import run_batch
+    for result in run_batch('config.ini', ['input/Hans_AccGyr.csv']):
+        print(result.filename, result.E_kin.max())
+These are:
+    run_batch(), load_config(), _run_job(), _init_worker(), _headless()
+"""
+
+import os
+import sys
+import io
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+
+import processing as proces
+import subprocessing as sub
+import conversions as conv
+from config_parser import get_config, str_gen
+from datatyp import Result
+
+
+def run_batch(config='config.ini', files: list = None, processes: int = 1,
+              quiet: bool = True, t_start: float = None, t_end: float = None):
+    '''
+    Processes the files and yields the results in the order of files.
+
+    Parameters
+    ----------
+    config : str or tuple, optional
+        Name of the config file or the dictionaries of
+        config_parser.get_config. The default is 'config.ini'.
+    files : list, optional
+        The files to be processed. The default are the files of the config.
+    processes : int, optional
+        Number of processes. The default is 1.
+    quiet : bool, optional
+        Suppress the messages of the processing. The default is True.
+    t_start : float, optional
+        Only the samples from this elapsed (s) on are processed. The default
+        is the value of the config.
+    t_end : float, optional
+        Only the samples up to this elapsed (s) are processed. The default
+        is the value of the config.
+
+    Yields
+    ------
+    result : datatyp.Result
+        The result of one file. A file which fails does not stop the batch,
+        its result has the error.
+    '''
+    _headless()
+    (main_dict, acc_dict, gyr_dict, graph_dict) = load_config(config, quiet)
+    for (key, value) in (('t_start', t_start), ('t_end', t_end)):
+        if value is not None:
+            acc_dict[key] = gyr_dict[key] = value
+    if main_dict['out_of_core']:
+        conv.use_scratch(main_dict['scratch_dir'],
+                         main_dict['scratch_threshold'])
+    if files is None:
+        if main_dict['filenames_auto']:
+            files = str_gen(main_dict['names'], main_dict['measurements'])
+        else:
+            files = main_dict['filenames']
+
+    graph_dict = dict(graph_dict)
+    if graph_dict['do_graph']:
+        graph_dict['save_graph'] = True
+        os.makedirs('saved_graphs', exist_ok=True)
+
+    jobs = [(filename, acc_dict, gyr_dict, graph_dict, quiet)
+            for filename in files]
+    if processes > 1:
+        with Pool(processes, initializer=_init_worker) as pool:
+            yield from pool.imap(_run_job, jobs)
+    else:
+        for job in jobs:
+            yield _run_job(job)
+
+
+def load_config(config='config.ini', quiet: bool = True) -> tuple:
+    '''
+    Reads the config file, or returns copies of the given dictionaries.
+
+    Returns
+    -------
+    (main_dict, acc_dict, gyr_dict, graph_dict) : tuple
+        See config_parser.get_config.
+    '''
+    if not isinstance(config, str):
+        return tuple(dict(config_dict) for config_dict in config)
+
+    with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+        return get_config(filename=config)
+
+
+def _run_job(job: tuple) -> Result:
+    '''
+    Processes one file and catches all of its errors, e.g. an IndexError of
+    a file with too few columns.
+    '''
+    (filename, acc_dict, gyr_dict, graph_dict, quiet) = job
+    try:
+        with redirect_stdout(io.StringIO() if quiet else sys.stdout):
+            data = proces.main(filename, acc_dict, gyr_dict, graph_dict)
+    except Exception as error:
+        return Result(filename, error=repr(error))
+    finally:
+        if graph_dict['do_graph'] and 'matplotlib.pyplot' in sys.modules:
+            from matplotlib import pyplot as plt
+            plt.close('all')
+
+    if data[1] is None:
+        return Result(filename, error='No analysis method is known.')
+    return Result(*data)
+
+
+def _init_worker() -> None:
+    '''
+    Initializer for the worker processes: Ctrl+C only stops the main process
+    and matplotlib does not open windows.
+    '''
+    sub.ignore_interrupt()
+    _headless()
+
+
+def _headless() -> None:
+    '''
+    Selects the backend Agg of matplotlib, also for new processes.
+    '''
+    os.environ['MPLBACKEND'] = 'Agg'
+    if 'matplotlib' in sys.modules:
+        import matplotlib
+        matplotlib.use('Agg')
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The benchmark module measures the stages of the processing with a fixed
+workload and compares the result with a saved baseline, so a new version of
+the program can be checked for regressions before it is deployed.
+The workload are the recordings of Hans in input/ and synthetic recordings
+which repeat them scale times, processed one after the other by
+processing.main and saved by data_output.data_storer. The workload is run
+repeat times with timing, the median of every stage is taken, and once more
+with memory tracking, see the module instrument. The integration mode of
+the config is replaced by the fast mode 'a' of _SETTINGS, so the time of
+the workload does not depend on the mode of the config, and the settings
+are saved in the baseline. tracemalloc slows the reading down a lot, so the
+default workload is small.
+    python benchmark.py record NAME
+    python benchmark.py compare NAME
+A baseline is saved as benchmarks/NAME.json. compare exits with 1 if a stage
+is slower or needs more memory than the baseline by more than threshold.
+These are:
+    record(), compare(), run(), workload(), load_baseline(), _measure(),
+    _stages(), _regressed(), _table(), _change()
+"""
+
+import os
+import io
+import sys
+import json
+import argparse
+import platform
+import statistics
+import tempfile
+from datetime import datetime
+from contextlib import redirect_stdout
+import numpy as np
+
+import processing as proces
+import instrument
+from config_parser import get_config
+from data_output import data_storer, config_metadata
+
+_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'input')
+# Time in s below which a difference is seen as noise.
+_MIN_TIME = 0.02
+# Keys of the sensor configs which are fixed for the workload.
+_SETTINGS = {'integration_mode': 'a'}
+
+
+def record(name: str, config: str = 'config.ini', scale: int = 1,
+           repeat: int = 3, directory: str = 'benchmarks') -> dict:
+    '''
+    Runs the workload and saves the result as a baseline.
+
+    Parameters
+    ----------
+    name : str
+        Name of the baseline.
+    config : str, optional
+        The config file. The default is 'config.ini'.
+    scale : int, optional
+        How many times the synthetic recordings repeat the recordings of
+        Hans. The default is 1.
+    repeat : int, optional
+        How many times the workload is run with timing. The default is 3.
+    directory : str, optional
+        Folder of the baselines. The default is 'benchmarks'.
+
+    Returns
+    -------
+    result : dict
+        The saved baseline.
+    '''
+    result = run(config, scale, repeat)
+    result['name'] = name
+    os.makedirs(directory, exist_ok=True)
+    _path = os.path.join(directory, f'{name}.json')
+    with open(_path, 'w') as file:
+        json.dump(result, file, indent=1)
+    print(_table(result, None, 0.0))
+    print(f'{_path} saved.')
+    return result
+
+
+def compare(name: str, config: str = 'config.ini', threshold: float = 0.1,
+            directory: str = 'benchmarks') -> list:
+    '''
+    Runs the workload with the settings of a baseline and compares it.
+
+    Parameters
+    ----------
+    name : str
+        Name of the baseline.
+    config : str, optional
+        The config file. The default is 'config.ini'.
+    threshold : float, optional
+        Allowed relative increase of the time and the memory of a stage. The
+        default is 0.1.
+    directory : str, optional
+        Folder of the baselines. The default is 'benchmarks'.
+
+    Returns
+    -------
+    regressions : list
+        The stages which have regressed.
+    '''
+    baseline = load_baseline(name, directory)
+    result = run(config, baseline['scale'], baseline['repeat'],
+                 baseline.get('settings', _SETTINGS))
+    if result['config'] != baseline['config']:
+        print('Warning: the config differs from the config of the baseline.')
+    if result['platform'] != baseline['platform']:
+        print(f'Warning: the baseline was recorded with {baseline["platform"]}.')
+
+    regressions = [stage for (stage, now) in result['stages'].items()
+                   if stage in baseline['stages'] and
+                   _regressed(baseline['stages'][stage], now, threshold)]
+    print(_table(result, baseline, threshold))
+    if regressions:
+        print(f'\nRegressed by more than {threshold:.0%}: '
+              + ', '.join(regressions))
+    else:
+        print(f'\nNo stage has regressed by more than {threshold:.0%}.')
+    return regressions
+
+
+def run(config: str = 'config.ini', scale: int = 1, repeat: int = 3,
+        settings: dict = None) -> dict:
+    '''
+    Runs the workload.
+
+    Parameters
+    ----------
+    settings : dict, optional
+        Replaces these keys of the accelerometer and gyroscope config. The
+        default is None, then _SETTINGS is used.
+
+    Returns
+    -------
+    result : dict
+        The median time of every stage in s, the largest memory peak of
+        every stage in bytes, the settings and the platform.
+    '''
+    settings = dict(_SETTINGS if settings is None else settings)
+    with redirect_stdout(io.StringIO()):
+        (main_dict, acc_dict, gyr_dict, graph_dict) = get_config(config)
+    acc_dict = dict(acc_dict, **settings)
+    gyr_dict = dict(gyr_dict, **settings)
+    graph_dict = dict(graph_dict, do_graph=False, save_graph=False)
+    args = (acc_dict, gyr_dict, graph_dict, main_dict['save_formatter'])
+
+    with tempfile.TemporaryDirectory() as temp:
+        filenames = workload(temp, scale)
+        times = [_stages(_measure(temp, filenames, args, memory=False),
+                         'duration', sum)
+                 for _ in range(repeat)]
+        memory = _stages(_measure(temp, filenames, args, memory=True),
+                         'mem_peak', max)
+
+    stages = {stage: {'time': statistics.median(run_now.get(stage, 0.0)
+                                                for run_now in times),
+                      'mem_peak': memory.get(stage, 0)}
+              for stage in times[0]}
+    return {'date': str(datetime.now())[:19], 'scale': scale,
+            'repeat': repeat, 'files': len(filenames),
+            'platform': f'{platform.python_implementation()} '
+                        f'{platform.python_version()}, NumPy {np.__version__}',
+            'settings': settings,
+            'config': config_metadata(acc_dict, gyr_dict),
+            'stages': stages}
+
+
+def workload(directory: str, scale: int) -> list:
+    '''
+    Creates the synthetic recordings and returns the files of the workload.
+    The synthetic recordings repeat the recordings of Hans scale times, the
+    time continues after every repetition.
+
+    Parameters
+    ----------
+    directory : str
+        Folder for the synthetic recordings.
+    scale : int
+        Number of repetitions.
+
+    Returns
+    -------
+    filenames : list
+        The files for processing.main.
+    '''
+    for sensor in ('Accelerometer', 'Gyroscope'):
+        with open(os.path.join(_INPUT, f'Hans_{sensor}.csv')) as file:
+            header = file.readline()
+            rows = [line.rstrip('\n').split(',') for line in file if
+                    line.strip()]
+        elapsed = np.array([float(row[2]) for row in rows])
+        period = elapsed[-1] - elapsed[0] + np.diff(elapsed).mean()
+        with open(os.path.join(directory, f'Synthetic_{sensor}.csv'),
+                  'w') as file:
+            file.write(header)
+            for n in range(scale):
+                file.writelines(
+                    f'{row[0]},{row[1]},{time_now:.3f},{",".join(row[3:])}\n'
+                    for (row, time_now) in zip(rows, elapsed + n*period))
+
+    return [os.path.join(_INPUT, f'Hans_{sensor}.csv')
+            for sensor in ('Accelerometer', 'Gyroscope')] + [
+        os.path.join(directory, f'Synthetic_{sensor}.csv')
+        for sensor in ('Accelerometer', 'Gyroscope', 'AccGyr')]
+
+
+def load_baseline(name: str, directory: str = 'benchmarks') -> dict:
+    '''
+    Reads a baseline.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no baseline with this name.
+    '''
+    _path = os.path.join(directory, f'{name}.json')
+    if not os.path.exists(_path):
+        raise FileNotFoundError(f'There is no baseline {_path}.')
+    with open(_path) as file:
+        return json.load(file)
+
+
+def _measure(directory: str, filenames: list, args: tuple,
+             memory: bool) -> list:
+    '''
+    Runs the workload once in directory and returns the spans.
+    '''
+    (acc_dict, gyr_dict, graph_dict, formatter) = args
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        instrument.enable(os.path.join(directory, 'timing'), memory=memory)
+        with redirect_stdout(io.StringIO()):
+            data = [proces.main(filename, acc_dict, gyr_dict, graph_dict)
+                    for filename in filenames]
+            with instrument.span('output'):
+                data_storer(data, formatter)
+    finally:
+        records = instrument.collect()
+        os.chdir(cwd)
+    return records
+
+
+def _stages(records: list, key: str, function) -> dict:
+    '''
+    Combines the values of key of the spans of every stage with function.
+    '''
+    values = {}
+    for record in records:
+        values.setdefault(record['stage'], []).append(record.get(key, 0))
+    return {stage: function(values_now) for (stage, values_now) in
+            values.items()}
+
+
+def _regressed(base: dict, now: dict, threshold: float) -> bool:
+    '''
+    Tests whether a stage is slower or needs more memory than allowed.
+    '''
+    slower = (now['time'] > base['time'] * (1+threshold) and
+              now['time'] - base['time'] > _MIN_TIME)
+    larger = now['mem_peak'] > base['mem_peak'] * (1+threshold) + 2**20
+    return slower or larger
+
+
+def _table(result: dict, baseline: dict, threshold: float) -> str:
+    '''
+    Creates a table of the stages, with the change to the baseline.
+    '''
+    mib = 2**20
+    lines = [f'\n{result["files"]} files, scale {result["scale"]}, '
+             f'median of {result["repeat"]} runs, {result["platform"]}',
+             f'{"stage":<12} {"time in s":>10} {"peak MiB":>9}']
+    if baseline is not None:
+        lines[1] += f' {"base s":>8} {"change":>7} {"base MiB":>9} {"change":>7}'
+    for (stage, now) in sorted(result['stages'].items(),
+                               key=lambda item: -item[1]['time']):
+        line = f'{stage:<12} {now["time"]:>10.3f} {now["mem_peak"]/mib:>9.1f}'
+        base = None if baseline is None else baseline['stages'].get(stage)
+        if base is not None:
+            line += (f' {base["time"]:>8.3f}'
+                     f' {_change(base["time"], now["time"]):>7}'
+                     f' {base["mem_peak"]/mib:>9.1f}'
+                     f' {_change(base["mem_peak"], now["mem_peak"]):>7}')
+            if _regressed(base, now, threshold):
+                line += '  REGRESSED'
+        elif baseline is not None:
+            line += '  new'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _change(base: float, now: float) -> str:
+    '''
+    Returns the relative change as text.
+    '''
+    if base == 0:
+        return '-'
+    return f'{(now-base)/base:+.0%}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Performance baselines.')
+    parser.add_argument('command', choices=['record', 'compare'])
+    parser.add_argument('name', help='name of the baseline')
+    parser.add_argument('--config', default='config.ini')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='repetitions of the synthetic recordings')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs with timing, the median is taken')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed relative increase for compare')
+    parser.add_argument('--dir', default='benchmarks',
+                        help='folder of the baselines')
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.name, args.config, args.scale, args.repeat, args.dir)
+    elif compare(args.name, args.config, args.threshold, args.dir):
+        sys.exit(1)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The cache module stores the results of processing.main on disk, so that
+unchanged files do not have to be processed again. A result is found by a
+hash of the content of the input files and of all config values which change
+the result.
+These are:
+    input_files(), file_hash(), job_key(), load(), store(), write_manifest(),
+    _normalize()
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+import numpy as np
+
+# Has to be changed if the stored results are no longer compatible.
+CACHE_VERSION = '2'
+# Config values which do not change the result.
+_IGNORED_KEYS = ['threads', 'chunk_processes', 'index_stride']
+_ENERGIES = ['t', 'E_trans', 'E_rot', 'E_kin']
+
+
+def input_files(filename: str) -> list:
+    '''
+    Gives the files which are read for a job.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file being processed.
+
+    Returns
+    -------
+    files : list
+        The files which are read.
+    '''
+    if 'AccGyr' in filename:
+        return [filename.replace('AccGyr', 'Gyroscope'),
+                filename.replace('AccGyr', 'Accelerometer')]
+
+    return [filename]
+
+
+def file_hash(filename: str, block_size: int = 1 << 20) -> str:
+    '''
+    Calculates the sha256 hash of the content of a file.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file.
+    block_size : int, optional
+        How many bytes are read at once. The default is 1 MiB.
+
+    Returns
+    -------
+    str
+        The hash as hex string.
+    '''
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+def job_key(filename: str, acc_dict: dict, gyr_dict: dict) -> str:
+    '''
+    Creates the key of a job from the content of its input files and the
+    config values which are used for it.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file being processed.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+
+    Returns
+    -------
+    key : str
+        The key of the job or None if an input file cannot be read.
+    '''
+    key = {'version': CACHE_VERSION,
+           'kind': filename.split('_')[-1].replace('.csv', '')}
+    if 'Accelerometer' in filename or 'AccGyr' in filename:
+        key['ACCELEROMETER'] = _normalize(acc_dict)
+    if 'Gyroscope' in filename or 'AccGyr' in filename:
+        key['GYROSCOPE'] = _normalize(gyr_dict)
+
+    try:
+        key['files'] = [file_hash(name) for name in input_files(filename)]
+    except OSError:
+        return None
+
+    key_str = json.dumps(key, sort_keys=True)
+    return hashlib.sha256(key_str.encode()).hexdigest()
+
+
+def load(cache_dir: str, key: str, filename: str) -> tuple:
+    '''
+    Loads a result from the cache.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache.
+    key : str
+        The key of the job.
+    filename : str
+        Name of the file being processed.
+
+    Returns
+    -------
+    data : tuple
+        Result like processing.main or None if nothing is stored.
+    '''
+    if key is None:
+        return None
+
+    try:
+        with np.load(os.path.join(cache_dir, key + '.npz')) as stored:
+            data = tuple(stored[name] if name in stored else None
+                         for name in _ENERGIES)
+    except (OSError, ValueError):
+        return None
+
+    return (filename,) + data
+
+
+def store(cache_dir: str, key: str, data: tuple) -> bool:
+    '''
+    Stores a result in the cache. Failed jobs are not stored.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache.
+    key : str
+        The key of the job.
+    data : tuple
+        Result of processing.main.
+
+    Returns
+    -------
+    bool
+        Whether the result has been stored.
+    '''
+    if key is None or data[1] is None:
+        return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {name: value for (name, value) in zip(_ENERGIES, data[1:])
+              if value is not None}
+    _path = os.path.join(cache_dir, key + '.npz')
+    tmp_path = os.path.join(cache_dir, f'{key}.{os.getpid()}.tmp.npz')
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, _path)
+    return True
+
+
+def write_manifest(cache_dir: str, entries: list) -> None:
+    '''
+    Writes which results have been reused and which have been computed to
+    manifest.json in the cache directory.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory of the cache.
+    entries : list
+        One tuple (filename, key, status) per job.
+
+    Returns
+    -------
+    None
+    '''
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = {'date': str(datetime.now())[:19],
+                'jobs': [{'filename': filename, 'key': key, 'status': status}
+                         for (filename, key, status) in entries]}
+    with open(os.path.join(cache_dir, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+
+    reused = sum(1 for entry in entries if entry[2] == 'reused')
+    print(f'{reused} of {len(entries)} result(s) have been reused from the\
+ cache.')
+
+
+def _normalize(sensor_dict: dict) -> dict:
+    '''
+    Converts the config values of a sensor into a form which can be hashed.
+    '''
+    res = {}
+    for (key, value) in dict(sensor_dict.items()).items():
+        if key in _IGNORED_KEYS:
+            continue
+        if isinstance(value, np.ndarray):
+            value = [float(n) for n in value]
+        elif isinstance(value, float):
+            value = repr(value)
+        res[key] = value
+
+    return res
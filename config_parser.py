@@ -8,7 +8,8 @@ In the config_parser module, the config.ini is read in and processed.
 These are:
     get_config, _main_config, _acc_config, _gyr_config, _graph_config,
     int_config, float_config, array_config, list_config, bool_config,
-    str_config, test_list
+    str_config, choice_config, test_list, get_sweep, sweep_values,
+    str_gen
 """
 
 from configparser import ConfigParser
@@ -60,10 +61,12 @@ def get_config(filename: str = 'config.ini') -> dict:
     except KeyError:
         graph_dict = graph_config(list())
 
-    acc_dict.update({'r': main_dict['r']})
-    acc_dict.update({'m': main_dict['m']})
-    gyr_dict.update({'r': main_dict['r']})
-    gyr_dict.update({'m': main_dict['m']})
+    for key in ['r', 'm', 'threads', 'chunk_size', 'chunk_overlap',
+                'chunk_processes', 'compact', 't_start', 't_end',
+                'index_stride', 'activity', 'activity_window',
+                'activity_padding']:
+        acc_dict.update({key: main_dict[key]})
+        gyr_dict.update({key: main_dict[key]})
     return (main_dict, acc_dict, gyr_dict, graph_dict)
 
 
@@ -92,7 +95,45 @@ def main_config(config: ConfigParser) -> dict:
     bool_config(main_dict, 'filenames_auto', True)
     bool_config(main_dict, 'save_output', False)
     bool_config(main_dict, 'multi_processing', 'AUTO')
+    float_config(main_dict, 'memory_budget', 0.0)
+    int_config(main_dict, 'threads', 1)
+    int_config(main_dict, 'chunk_size', 0)
+    int_config(main_dict, 'chunk_overlap', 1000)
+    int_config(main_dict, 'chunk_processes', cpu_count())
+    bool_config(main_dict, 'compact', False)
+    float_config(main_dict, 't_start', None)
+    float_config(main_dict, 't_end', None)
+    int_config(main_dict, 'index_stride', 1000)
+    bool_config(main_dict, 'activity', False)
+    int_config(main_dict, 'activity_window', 50)
+    int_config(main_dict, 'activity_padding', 50)
+    bool_config(main_dict, 'out_of_core', False)
+    str_config(main_dict, 'scratch_dir', 'scratch')
+    float_config(main_dict, 'scratch_threshold', 64.0)
+    bool_config(main_dict, 'cache', False)
+    str_config(main_dict, 'cache_dir', 'cache')
+    str_config(main_dict, 'watch_dir', 'input/')
+    float_config(main_dict, 'watch_interval', 2.0)
+    bool_config(main_dict, 'service', False)
+    str_config(main_dict, 'service_socket', 'mmc_service.sock')
+    str_config(main_dict, 'spool_dir', 'spool')
+    float_config(main_dict, 'heartbeat_timeout', 30.0)
+    int_config(main_dict, 'max_retries', 3)
+    bool_config(main_dict, 'pipeline', False)
+    int_config(main_dict, 'pipeline_readers', 2)
+    int_config(main_dict, 'pipeline_writers', 1)
+    int_config(main_dict, 'pipeline_depth', 4)
     formatter_config(main_dict, 'save_formatter', '%1.5e')
+    choice_config(main_dict, 'save_format', 'csv',
+                  {'csv': 'csv', 'npz': 'npz', 'parquet': 'parquet',
+                   'h5': 'hdf5', 'hdf5': 'hdf5'})
+    bool_config(main_dict, 'timing', False)
+    str_config(main_dict, 'timing_dir', 'timing')
+    bool_config(main_dict, 'trace_memory', False)
+    bool_config(main_dict, 'profile', False)
+    str_config(main_dict, 'profile_dir', 'profile')
+    bool_config(main_dict, 'progress', False)
+    str_config(main_dict, 'progress_file', 'progress.json')
     return main_dict
 
 
@@ -169,6 +210,8 @@ def graph_config(config: ConfigParser) -> dict:
     bool_config(graph_dict, 'do_graph', True)
     bool_config(graph_dict, 'save_graph', False)
     formatter_config(graph_dict, 'formatter', '%1.2e')
+    int_config(graph_dict, 'render_processes', 1)
+    int_config(graph_dict, 'pixel_width', 640)
     return graph_dict
 
 
@@ -199,6 +242,7 @@ def int_config(test_dict: dict, config: str, default: int) -> None:
 def float_config(test_dict: dict, config: str, default: float) -> None:
     '''
     Converts the read string into an float and updates the dictionary.
+    auto is converted into None.
 
     Parameters
     ----------
@@ -214,7 +258,10 @@ def float_config(test_dict: dict, config: str, default: float) -> None:
     None
     '''
     try:
-        test_dict[config] = float(test_dict[config])
+        if test_dict[config] in ['Auto', 'AUTO', 'auto']:
+            test_dict[config] = None
+        else:
+            test_dict[config] = float(test_dict[config])
     except KeyError:
         test_dict.update({config: default})
         print(f'The default value has been selected for {config}. This is {default}.')
@@ -324,6 +371,44 @@ def str_config(test_dict: dict, config: str, default: str) -> None:
         print(f'The default value has been selected for {config}. This is {default}.')
 
 
+def choice_config(test_dict: dict, config: str, default: str,
+                  choices: dict) -> None:
+    '''
+    Normalises the read string to one of the allowed values, upper and lower
+    case are not distinguished.
+
+    Parameters
+    ----------
+    test_dict : dict
+        The dictionary to be changed.
+    config : str
+        Which key to retrieve.
+    default : str
+        The default value for this key if it does not exist.
+    choices : dict
+        The allowed values in lower case and the value they are stored as.
+
+    Raise
+    -----
+    ValueError
+        If the value is none of the choices.
+
+    Returns
+    -------
+    None
+    '''
+    if config not in test_dict:
+        test_dict.update({config: default})
+        print(f'The default value has been selected for {config}. This is {default}.')
+        return
+
+    value = test_dict[config].strip().lower()
+    if value not in choices:
+        raise ValueError(f'{test_dict[config]} is no valid value for '
+                         f'{config}. Possible are {", ".join(choices)}.')
+    test_dict[config] = choices[value]
+
+
 def formatter_config(test_dict: dict, config: str, default: str) -> None:
     '''
     Converts the read string into an formatter and updates the dictionary.
@@ -348,6 +433,96 @@ def formatter_config(test_dict: dict, config: str, default: str) -> None:
         print(f'The default value has been selected for {config}. This is {default}.')
 
 
+def get_sweep(acc_dict: dict, gyr_dict: dict,
+              filename: str = 'config.ini') -> dict:
+    '''
+    Reads the [SWEEP] section of the config file. Every key is the name of a
+    key of [ACCELEROMETER] or [GYROSCOPE] with the prefix acc_ or gyr_, the
+    value is a list of the values to be tested.
+
+    Parameters
+    ----------
+    acc_dict : dict
+        Dictionary which has the constants for the acelerometer.
+    gyr_dict : dict
+        Dictionary which has the constants for the gyroscope.
+    filename : str, optional
+        Name of the config file. The default is 'config.ini'.
+
+    Raise
+    -----
+    ValueError
+        If a key has no valid prefix or the sensor has no such key.
+
+    Returns
+    -------
+    sweep_dict : dict
+        The values to be tested for 'ACCELEROMETER' and 'GYROSCOPE'.
+    '''
+    config = ConfigParser()
+    config.read(filename)
+    try:
+        section = dict(config['SWEEP'])
+    except KeyError:
+        section = dict()
+
+    sweep_dict = {'ACCELEROMETER': {}, 'GYROSCOPE': {}}
+    for (key, value) in section.items():
+        if key.startswith('acc_'):
+            (name, sensor_dict) = ('ACCELEROMETER', acc_dict)
+        elif key.startswith('gyr_'):
+            (name, sensor_dict) = ('GYROSCOPE', gyr_dict)
+        else:
+            raise ValueError(f'{key} has to start with acc_ or gyr_.')
+
+        if key[4:] not in sensor_dict:
+            raise ValueError(f'{key[4:]} is no config key of the {name}.')
+
+        sweep_dict[name][key[4:]] = sweep_values(value, sensor_dict[key[4:]],
+                                                 key)
+
+    return sweep_dict
+
+
+def sweep_values(value: str, default: object, config: str) -> list:
+    '''
+    Converts the read string into a list of values of the same type as the
+    default value.
+
+    Parameters
+    ----------
+    value : str
+        The read string.
+    default : object
+        The value of the sensor dictionary.
+    config : str
+        Which key is converted.
+
+    Raise
+    -----
+    TypeError
+        If values of this type cannot be tested.
+
+    Returns
+    -------
+    res : list
+        The values to be tested.
+    '''
+    values = value.replace(' ', '').split(',')
+    if isinstance(default, bool):
+        return [value in test_list(True) or (value not in test_list(False)
+                                             and test_list(value, config))
+                for value in values]
+    elif isinstance(default, int):
+        return [int(value) for value in values]
+    elif isinstance(default, float):
+        return [float(value) for value in values]
+    elif isinstance(default, str):
+        return values
+
+    raise TypeError(f'The values of {config} cannot be tested.')
+
+
 def test_list(test: bool, config: str = '') -> list:
     '''
     Gives a list of values to be interpreted as true or false.
@@ -381,6 +556,34 @@ def test_list(test: bool, config: str = '') -> list:
     return res
 
 
+def str_gen(mmc_names: list, measurements: list,
+            location: str = 'input/') -> list:
+    """
+    This function creates the input string.
+
+    Parameters
+    ----------
+    mmc_names : list
+        Names of the chips used.
+    measurements : list
+        What measurements have been made.
+    location : str, optional
+        Folder in which the data is stored. The default ist 'input/'
+
+    Returns
+    -------
+    filenames : list
+        List which contain the data strings
+    """
+    filenames = []
+    for name in mmc_names:
+        for measured in measurements:
+            fstring = f'{location}{name}_{measured}.csv'
+            filenames.append(fstring)
+
+    return filenames
+
+
 if __name__ == '__main__':
     for n in get_config():
         print(n)
@@ -6,12 +6,33 @@ Version: v0.4-beta
 
 In the conversions module, the data is converted into a different format.
 These are:
-    velocity(), rotation(), xyz(), timestep(), string(), intaxis(), rotvec(),
-    _ktest()
+    velocity(), rotation(), xyz(), timestep(), string(), smoothing(),
+    intaxis(), intaxis_chunked(), rotvec(), map_axes(), workspace(),
+    Workspace, use_scratch(), allocate(), active_segments(), _ktest(),
+    _chunk_weights(), _active_only(), _hold()
 """
 
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import current_process
 import numpy as np
-from scipy.interpolate import interp1d, UnivariateSpline
+
+import instrument
+
+# Workspace of every thread, see workspace.
+_LOCAL = threading.local()
+# Folder and size in bytes from which arrays are allocated in scratch files,
+# see use_scratch. The worker processes get them with the environment.
+_SCRATCH_ENV = 'MMC_SCRATCH_DIR'
+_SCRATCH_BYTES_ENV = 'MMC_SCRATCH_BYTES'
+_SCRATCH_DIR = os.environ.get(_SCRATCH_ENV)
+_SCRATCH_BYTES = int(os.environ.get(_SCRATCH_BYTES_ENV, 0))
+# A window is active if the standard deviation of the magnitude is larger
+# than this multiple of error, like the test of velocity and rotation. With
+# level, a point is also active if the magnitude itself is larger.
+_ACTIVITY_ERRORS = 25
 
 
 def velocity(a: np.ndarray, t: np.ndarray, acc_dict: dict,
@@ -46,51 +67,89 @@ def velocity(a: np.ndarray, t: np.ndarray, acc_dict: dict,
         Velocity vector in the same format as a.
     t_step : np.ndarray
         Time steps
+
+    With activity only the active segments of a are calculated, see
+    active_segments. Between the segments v is 0, so only a segment which
+    begins with the series starts with start_velocity, the others start from
+    0 like in the whole series. start_velocity None keeps the first step.
     """
+    if acc_dict['activity']:
+        segments = active_segments(a, acc_dict, 9.81 if acc_dict['in_g']
+                                   else 1.0)
+        acc_now = dict(acc_dict, activity=False)
+        return _active_only(velocity, a, t, segments, (True, False),
+                            (acc_now,), kwargs,
+                            (dict(acc_now, start_velocity=None),))
+
     err = acc_dict['error']
+    ws = workspace()
+    (a_x, a_y) = a.shape
+#  a is not changed, the acceleration is converted in a buffer.
+    acc = ws.get('acc', a.shape, a.dtype)
     if acc_dict['in_g']:
-        a *= 9.81
+        np.multiply(a, 9.81, out=acc)
+    else:
+        np.copyto(acc, a)
 
-    (a_x, a_y) = a.shape
-    v = np.zeros([a_x, 3])
-    v[0, :] = acc_dict['start_velocity']
     t_step = timestep(t)
-    if abs(a).max() <= err*25:
+    if err > 0:
+#  The quotient of divmod is never negative, so the sign of a is lost.
+        np.abs(acc, out=acc)
+        acc_max = acc.max()
+    else:
+        acc_max = max(acc.max(), -acc.min())
+    if acc_max <= err*25:
         raise RuntimeWarning('err is too large, the value is greater than the\
                              largest value.')
 
-    elif err != 0 and err > 0:
-        (a, _) = divmod(abs(a), err)
-        a *= err * np.sign(a)
+    elif err > 0:
+        np.floor_divide(acc, err, out=acc)
+        acc *= err
 
 # This code may be incorrect: Start/
     if 'rot_abs' in kwargs:
         rot_abs = kwargs['rot_abs']
         (rot_abs_x, rot_abs_y) = rot_abs.shape
         if rot_abs_y == 3 and (rot_abs_x, rot_abs_y) == (a_x, a_y):
-            a = rotvec(vec=a, rot=rot_abs)
+            acc = rotvec(vec=acc, rot=rot_abs)
             if 'rot_vel' in kwargs:
                 rot_vel = kwargs['rot_vel']
                 if rot_vel.shape == (rot_abs_x, rot_abs_y):
+#  The angular acceleration is rot_vel x sensorpos / t_step.
                     (x, y, z) = acc_dict['sensorpos']
-                    for n in range(rot_abs_x):
-                        rot_a = np.array([rot_vel[n, 1]*z - rot_vel[n, 2]*y,
-                                          rot_vel[n, 2]*x - rot_vel[n, 0]*z,
-                                          rot_vel[n, 0]*y - rot_vel[n, 1]*x])
-                        a[n, :] -= rot_a / t_step[n]
+                    rot_a = ws.get('rot_a', (a_x,), acc.dtype)
+                    temp = ws.get('temp', (a_x,), acc.dtype)
+                    for (n, (n_1, p_1), (n_2, p_2)) in [(0, (1, z), (2, y)),
+                                                        (1, (2, x), (0, z)),
+                                                        (2, (0, y), (1, x))]:
+                        np.multiply(rot_vel[:, n_1], p_1, out=rot_a)
+                        np.multiply(rot_vel[:, n_2], p_2, out=temp)
+                        rot_a -= temp
+                        rot_a /= t_step
+                        acc[:, n] -= rot_a
 
             if acc_dict['g_interfered']:
-                a[:, 2] -= 1.03*9.81
+                acc[:, 2] -= 1.03*9.81
 # /End
     elif acc_dict['g_interfered']:
-        a -= 3.27  # = 9.81/3
-
-    for n in range(1, a_x):
-        v[n, :] = a[n, :] * t_step[n] - v[n-1, :]  # I can't explain the minus,
-# but with a plus it always grows exponentially. And with the minus it
-# corresponds to the expectations.
-    v = intaxis(vec_1=t, vec_2=v, int_mode=acc_dict['integration_mode'],
-                k=acc_dict['degree_of_spline'], s=acc_dict['smoothes'])
+        acc -= 3.27  # = 9.81/3
+
+#  v[n] = a[n]*t_step[n] - v[n-1], with the minus I can't explain, but with
+#  a plus it always grows exponentially. And with the minus it corresponds to
+#  the expectations. With the alternating sign s[n], s[n]*v[n] is the
+#  cumulative sum of s[n]*a[n]*t_step[n]. A change of the sign is exact, so
+#  the result is the same as step by step.
+    v = ws.get('velocity', (a_x, 3), acc.dtype)
+    np.multiply(acc, t_step[:, np.newaxis], out=v)
+    if acc_dict['start_velocity'] is not None:
+        v[0, :] = acc_dict['start_velocity']
+    sign = ws.get('sign', (a_x, 1), acc.dtype)
+    sign[0::2] = 1
+    sign[1::2] = -1
+    v *= sign
+    np.add.accumulate(v, axis=0, out=v)
+    v *= sign
+    v = smoothing(vec_1=t, vec_2=v, sensor_dict=acc_dict)
     return (v, t_step)
 
 
@@ -131,45 +190,68 @@ def rotation(rot_raw: np.ndarray, t: np.ndarray, rot_mode: str,
         Time steps.
     rot_abs : np.array
         absolute rotation
+
+    With activity only the active segments of rot_raw are calculated, see
+    active_segments. A constant rotation is active as well. Between the
+    segments rot_vel is 0 and rot_abs keeps the value of the end of the last
+    segment. Only a segment which begins with the series starts with
+    start_rotation, start_rotation None keeps the first measured value.
     """
+    if gyr_dict['activity']:
+        segments = active_segments(rot_raw, gyr_dict, np.pi/180 if
+                                   gyr_dict['in_grad'] else 1.0, level=True)
+        gyr_now = dict(gyr_dict, activity=False)
+        res = _active_only(rotation, rot_raw, t, segments,
+                           (rot_mode not in 'r', False, rot_mode in 'rc'),
+                           (rot_mode, gyr_now), {},
+                           (rot_mode, dict(gyr_now, start_rotation=None)))
+        if res[2] is not None:
+            _hold(res[2], segments)
+        return res
+
     err = gyr_dict['error']
-    int_mode = gyr_dict['integration_mode']
-    k = gyr_dict['degree_of_spline']
-    s = gyr_dict['smoothes']
-    rot_raw[0, :] = gyr_dict['start_rotation']
-    (ii, _) = rot_raw.shape
-    if abs(rot_raw).max() <= err*25:
+    ws = workspace()
+#  rot_raw is not changed, the rotation is converted in a buffer.
+    rot = ws.get('rot', rot_raw.shape, rot_raw.dtype)
+    np.copyto(rot, rot_raw)
+    if gyr_dict['start_rotation'] is not None:
+        rot[0, :] = gyr_dict['start_rotation']
+    if max(rot.max(), -rot.min()) <= err*25:
         raise RuntimeWarning('err is too large, all results would be zero.')
 
     if gyr_dict['in_grad']:
-        rot_raw *= np.pi/180
-
-    if err != 0 and err > 0:
-        rot_vel = abs(rot_raw) // err
-        rot_vel *= err * np.sign(rot_raw)
+        rot *= np.pi/180
+
+    if err > 0:
+        rot_vel = ws.get('rot_vel', rot.shape, rot.dtype)
+        np.abs(rot, out=rot_vel)
+        np.floor_divide(rot_vel, err, out=rot_vel)
+        rot_vel *= err
+        np.copysign(rot_vel, rot, out=rot_vel)
     else:
-        rot_vel = rot_raw
+        rot_vel = rot
 
     t_step = timestep(t)
+#  The absolute rotation is taken modulo 2 pi, with the sign of the rotation.
     if rot_mode in 'v':
-        rot_vel = intaxis(vec_1=t, vec_2=rot_vel, int_mode=int_mode, k=k, s=s)
+        rot_vel = smoothing(vec_1=t, vec_2=rot_vel, sensor_dict=gyr_dict)
         rot_abs = None
 
     elif rot_mode in 'r':
-        rot_abs = np.zeros(rot_vel.shape)
-        for n in range(1, ii):
-            rot_abs[n, :] = rot_abs[n-1, :] + rot_vel[n, :]*t_step[0, n]
-        rot = intaxis(vec_1=t, vec_2=rot_abs, int_mode=int_mode, k=k, s=s)
-        (_, rot_abs) = np.divmod(abs(rot), 2*np.pi) * np.sign(rot)
+        rot_abs = ws.get('rot_abs', rot_vel.shape, np.float64)
+        np.multiply(rot_vel, t_step[:, np.newaxis], out=rot_abs)
+        rot_abs[0, :] = 0
+        np.add.accumulate(rot_abs, axis=0, out=rot_abs)
+        rot_abs = smoothing(vec_1=t, vec_2=rot_abs, sensor_dict=gyr_dict)
+        np.fmod(rot_abs, 2*np.pi, out=rot_abs)
         rot_vel = None
 
     elif rot_mode in 'c':
-        rot_vel = intaxis(vec_1=t, vec_2=rot_vel, int_mode=int_mode, k=k, s=s)
-        rot_abs = np.zeros(rot_vel.shape)
-        rot_abs[0, :] = rot_vel[0, :] * t_step[0]
-        for n in range(1, ii):
-            rot_abs[n, :] = rot_abs[n-1, :] + rot_vel[n, :]*t_step[n]
-        (_, rot_abs) = np.divmod(abs(rot_abs), 2*np.pi) * np.sign(rot_abs)
+        rot_vel = smoothing(vec_1=t, vec_2=rot_vel, sensor_dict=gyr_dict)
+        rot_abs = allocate(rot_vel.shape, np.result_type(rot_vel, t_step))
+        np.multiply(rot_vel, t_step[:, np.newaxis], out=rot_abs)
+        np.add.accumulate(rot_abs, axis=0, out=rot_abs)
+        np.fmod(rot_abs, 2*np.pi, out=rot_abs)
 
     else:
         raise ValueError(f'The specified mode is not known: {rot_mode}.')
@@ -196,12 +278,10 @@ def xyz(t_step: np.ndarray, v: np.ndarray,
     xyz_res : np.ndarray
         xyz position of the sensors during the measurement.
     """
-    (lenx, leny) = v.shape
-    xyz_res = np.zeros([lenx, leny])
+    xyz_res = allocate(v.shape)
+    np.multiply(v, t_step[:, np.newaxis], out=xyz_res)
     xyz_res[0, :] = xyz_0[:]
-    for n in range(1, lenx):
-        xyz_res[n, :] = v[n, :] * t_step[n] + xyz_res[n-1, :]
-
+    np.add.accumulate(xyz_res, axis=0, out=xyz_res)
     return xyz_res
 
 
@@ -219,13 +299,44 @@ def timestep(t: np.ndarray) -> np.ndarray:
     t_step : np.ndarray
         Time steps.
     """
-    t_step = np.zeros(t.shape)
-    t_step[:] = t[-1] / t.size
+    t_step = allocate(t.shape)
+    t_step[:] = (t[-1] - t[0]) / t.size
     return t_step
 
 
+def smoothing(vec_1: np.ndarray, vec_2: np.ndarray,
+              sensor_dict: dict) -> np.ndarray:
+    """
+    Smoothes all axes of the given array with the settings of the sensor.
+    Long measurement series are split into chunks, see intaxis_chunked.
+
+    Parameters
+    ----------
+    vec_1 : np.ndarray
+        Values to be interpolated to.
+    vec_2 : np.ndarray
+        The array to be interpolated.
+    sensor_dict : dict
+        The dictionary which stores all constants for the sensor.
+
+    Returns
+    -------
+    vec_res : np.ndarray
+        Interpolated vector.
+    """
+    with instrument.span('intaxis'):
+        return intaxis_chunked(vec_1=vec_1, vec_2=vec_2,
+                               int_mode=sensor_dict['integration_mode'],
+                               k=sensor_dict['degree_of_spline'],
+                               s=sensor_dict['smoothes'],
+                               threads=sensor_dict['threads'],
+                               chunk_size=sensor_dict['chunk_size'],
+                               overlap=sensor_dict['chunk_overlap'],
+                               processes=sensor_dict['chunk_processes'])
+
+
 def intaxis(vec_1: np.ndarray, vec_2: np.ndarray, int_mode: str = 'i',
-            k: int = 5, s: float = 0.8) -> np.ndarray:
+            k: int = 5, s: float = 0.8, threads: int = 1) -> np.ndarray:
     """
     Interpolate along all y-axes of the given array.
 
@@ -246,6 +357,8 @@ def intaxis(vec_1: np.ndarray, vec_2: np.ndarray, int_mode: str = 'i',
         The default is int(5).
     s : float, optional
         Positive smoothing factor. The default is 0.8.
+    threads : int, optional
+        How many threads process the axes at the same time. The default is 1.
 
     Raise
     -----
@@ -263,35 +376,129 @@ def intaxis(vec_1: np.ndarray, vec_2: np.ndarray, int_mode: str = 'i',
         raise TypeError(f'k has the wrong type. Is {type(k)} and not int.')
 
     (x, y) = vec_2.shape
-    vec_res = np.zeros((x, y))
+    vec_res = allocate((x, y), vec_2.dtype)
+#  SciPy is only imported when it is needed, see api.py.
     if int_mode in ['s', 'S']:
-        for n in range(0, y):
+        from scipy.interpolate import UnivariateSpline
+
+        def axis(n):
             spl = UnivariateSpline(x=vec_1, y=vec_2[:, n], k=k, s=s,
                                    check_finite=False)
             vec_res[:, n] = spl(vec_1)
 
     elif int_mode in ['i', 'I']:
-        k = _ktest(k)
-        for n in range(0, y):
-            fun = interp1d(x=vec_1, y=vec_2[:, n], kind=k,
+        from scipy.interpolate import interp1d
+        kind = _ktest(k)
+
+        def axis(n):
+            fun = interp1d(x=vec_1, y=vec_2[:, n], kind=kind,
                            fill_value='extrapolate', assume_sorted=True)
             vec_res[:, n] = fun(vec_1)
 
     elif int_mode in ['a', 'A']:
-        _vec_2 = vec_2
-        for n in range(0, x):
-            n_low = n - k
-            n_high = n + k
-            n_low = max(n_low, 0)
-            n_high = min(n_high, x)
+#  The mean of n is taken over the values n-k to n+k-1, at the edges only over
+#  the existing ones.
+        n_range = np.arange(x)
+        count = np.minimum(n_range + k, x) - np.maximum(n_range - k, 0)
 
-            for m in range(0, y):
-                _vecm = _vec_2[n_low:n_high, m]
-                vec_res[n, m] = _vecm.mean()
+        def axis(n):
+            vec_sum = np.convolve(vec_2[:, n], np.ones(2*k))[k-1:k-1+x]
+            np.divide(vec_sum, count, out=vec_res[:, n])
 
     else:
         raise ValueError(f'The specified mode is not known: {int_mode}.')
 
+    map_axes(axis, y, threads)
+    return vec_res
+
+
+def intaxis_chunked(vec_1: np.ndarray, vec_2: np.ndarray, int_mode: str = 'i',
+                    k: int = 5, s: float = 0.8, threads: int = 1,
+                    chunk_size: int = 0, overlap: int = 1000,
+                    processes: int = 1) -> np.ndarray:
+    """
+    Like intaxis, but a long measurement series is split into chunks of
+    chunk_size points which are processed by a process pool. Every chunk is
+    extended by overlap points on both sides. Neighbouring chunks are blended
+    linearly where both of them are valid.
+
+    Boundary effects:
+        i : The interpolation goes through the points, so the result is the
+            same as without chunks.
+        a : The first and last k points of a chunk are not used. If overlap
+            is larger than k the result is the same as without chunks,
+            otherwise overlap is increased to k+1.
+        s : Every chunk gets its own spline, with s scaled by the length of
+            the chunk, and the outer half of the overlap is not used. The
+            blend is a convex combination of two splines, so the sum of the
+            squared residuals is at most s*(1 + 2*overlap/chunk_size). The
+            curve can differ from a single spline near the chunk borders.
+
+    Parameters
+    ----------
+    vec_1 : np.ndarray
+        Values to be interpolated to.
+    vec_2 : np.ndarray
+        The array to be interpolated.
+    int_mode : string
+        Which mode to use, see intaxis.
+    k : int, optional
+        See intaxis. The default is int(5).
+    s : float, optional
+        See intaxis. The default is 0.8.
+    threads : int, optional
+        See intaxis. The default is 1.
+    chunk_size : int, optional
+        Number of points per chunk. With 0 or if the series is not longer
+        than chunk_size, intaxis is used directly. The default is 0.
+    overlap : int, optional
+        Number of points by which a chunk is extended on every side. The
+        default is 1000.
+    processes : int, optional
+        Number of processes for the chunks. In a daemon process, e.g. a
+        worker of multiprocessing, the chunks are processed one after the
+        other. The default is 1.
+
+    Returns
+    -------
+    vec_res : np.ndarray
+        Interpolated vector.
+    """
+    (x, y) = vec_2.shape
+    if chunk_size <= 0 or x <= chunk_size:
+        return intaxis(vec_1, vec_2, int_mode=int_mode, k=k, s=s,
+                       threads=threads)
+
+    if int_mode in ['a', 'A']:
+        margin = k
+        overlap = max(overlap, k+1)
+    elif int_mode in ['s', 'S']:
+        margin = overlap // 2
+    else:
+        margin = 0
+
+    bounds = [(max(start-overlap, 0), min(start+chunk_size+overlap, x))
+              for start in range(0, x, chunk_size)]
+    args = ([vec_1[lo:hi] for (lo, hi) in bounds],
+            [vec_2[lo:hi] for (lo, hi) in bounds],
+            [int_mode] * len(bounds), [k] * len(bounds),
+            [s * (hi-lo) / x for (lo, hi) in bounds],
+            [threads] * len(bounds))
+    if processes > 1 and not current_process().daemon:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            chunks = list(executor.map(intaxis, *args))
+    else:
+        chunks = list(map(intaxis, *args))
+
+    vec_res = allocate((x, y), vec_2.dtype)
+    weight_sum = np.zeros(x)
+    for ((lo, hi), chunk) in zip(bounds, chunks):
+        weight = _chunk_weights(hi-lo, margin*(lo > 0), margin*(hi < x),
+                                2*(overlap-margin))
+        vec_res[lo:hi] += chunk * weight[:, np.newaxis]
+        weight_sum[lo:hi] += weight
+
+    vec_res /= weight_sum[:, np.newaxis]
     return vec_res
 
 
@@ -388,15 +595,277 @@ def rotvec(vec: np.ndarray, rot: np.ndarray) -> np.ndarray:
     elif rot_y != 3:
         raise ValueError(f'rot does not have three elements on the y-axis. y = {rot_y}')
 
-    for n in range(0, vec_x):
-        vec[n, :] = np.sqrt(vec[n, 0]**2 + vec[n, 1]**2 + vec[n, 2]**2)
-        vec[n, 0] *= np.sin(rot[n, 2]) * np.cos(rot[n, 0])
-        vec[n, 1] *= np.sin(rot[n, 2]) * np.sin(rot[n, 0])
-        vec[n, 2] *= np.cos(rot[n, 2])
-
+    ws = workspace()
+    norm = ws.get('norm', (vec_x,), vec.dtype)
+    temp = ws.get('temp', (vec_x,), vec.dtype)
+    np.square(vec[:, 0], out=norm)
+    for n in (1, 2):
+        np.square(vec[:, n], out=temp)
+        norm += temp
+    np.sqrt(norm, out=norm)
+
+    sin_2 = ws.get('sin_2', (vec_x,), rot.dtype)
+    trig = ws.get('trig', (vec_x,), rot.dtype)
+    np.sin(rot[:, 2], out=sin_2)
+    np.cos(rot[:, 0], out=trig)
+    trig *= sin_2
+    np.multiply(norm, trig, out=vec[:, 0])
+    np.sin(rot[:, 0], out=trig)
+    trig *= sin_2
+    np.multiply(norm, trig, out=vec[:, 1])
+    np.cos(rot[:, 2], out=trig)
+    np.multiply(norm, trig, out=vec[:, 2])
     return vec
 
 
+def map_axes(fun, y: int, threads: int = 1) -> None:
+    """
+    Calls fun for every axis. If more than one thread is allowed, the axes are
+    processed by a thread pool. This only pays off for the parts where NumPy
+    and SciPy release the GIL.
+
+    Parameters
+    ----------
+    fun : callable
+        Function which gets the number of the axis.
+    y : int
+        Number of axes.
+    threads : int, optional
+        How many threads may be used. The default is 1.
+
+    Returns
+    -------
+    None.
+    """
+    if threads > 1 and y > 1:
+        with ThreadPoolExecutor(max_workers=min(threads, y)) as executor:
+            list(executor.map(fun, range(y)))
+
+    else:
+        for n in range(y):
+            fun(n)
+
+
+def workspace():
+    """
+    Returns the workspace of this thread. Every worker process keeps its
+    buffers for the next file, so they are only allocated again if a file
+    is longer.
+
+    Returns
+    -------
+    ws : Workspace
+        The workspace.
+    """
+    if not hasattr(_LOCAL, 'workspace'):
+        _LOCAL.workspace = Workspace()
+    return _LOCAL.workspace
+
+
+class Workspace:
+    """
+    Named buffers for the intermediate results of the conversions. A buffer
+    belongs to the function which uses the name and is only valid until the
+    function is called again, so results which are returned are never taken
+    from it.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+
+    def get(self, name: str, shape: tuple, dtype=np.float64) -> np.ndarray:
+        """
+        Returns the buffer name with the shape. The values are undefined.
+
+        Parameters
+        ----------
+        name : str
+            Name of the buffer.
+        shape : tuple
+            Shape of the buffer.
+        dtype : type, optional
+            Type of the values. The default is np.float64.
+
+        Returns
+        -------
+        buffer : np.ndarray
+            View of the buffer.
+        """
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        buffer = self.buffers.get((name, dtype))
+        if buffer is None or buffer.size < size:
+            buffer = allocate((size,), dtype)
+            self.buffers[(name, dtype)] = buffer
+        return buffer[:size].reshape(shape)
+
+    def clear(self) -> None:
+        """
+        Releases all buffers.
+        """
+        self.buffers.clear()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory of all buffers in bytes.
+        """
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+def use_scratch(directory: str, threshold: float) -> None:
+    """
+    Arrays from threshold MB on are allocated by allocate in files in
+    directory, which are mapped into memory. So a measurement series which
+    is larger than the RAM can be processed, the operating system keeps the
+    parts in the RAM which are used. This applies to this process and to the
+    processes started later.
+
+    Parameters
+    ----------
+    directory : str
+        Folder for the scratch files.
+    threshold : float
+        Size in MB from which an array is put into a scratch file.
+
+    Returns
+    -------
+    None.
+    """
+    global _SCRATCH_DIR, _SCRATCH_BYTES
+    os.makedirs(directory, exist_ok=True)
+    _SCRATCH_DIR = os.environ[_SCRATCH_ENV] = directory
+    _SCRATCH_BYTES = int(threshold * 2**20)
+    os.environ[_SCRATCH_BYTES_ENV] = str(_SCRATCH_BYTES)
+
+
+def allocate(shape: tuple, dtype=np.float64) -> np.ndarray:
+    """
+    Returns a new array filled with zeros. Large arrays are put into a
+    scratch file, see use_scratch. The file is deleted by the operating
+    system when the array is not used any longer, also if the program is
+    stopped.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the array.
+    dtype : type, optional
+        Type of the values. The default is np.float64.
+
+    Returns
+    -------
+    array : np.ndarray
+        The array, a np.memmap for a scratch file.
+    """
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if _SCRATCH_DIR is None or nbytes < max(_SCRATCH_BYTES, 1):
+        return np.zeros(shape, dtype=dtype)
+
+    with tempfile.TemporaryFile(dir=_SCRATCH_DIR, prefix='mmc_') as file:
+        return np.memmap(file, dtype=dtype, mode='w+', shape=shape)
+
+
+def _chunk_weights(length: int, margin_low: int, margin_high: int,
+                   ramp: int) -> np.ndarray:
+    """
+    Weights of a chunk for intaxis_chunked. The margins are 0, after that the
+    weights rise linear over ramp points to 1. There is no ramp on a side
+    without margin.
+
+    Parameters
+    ----------
+    length : int
+        Number of points of the chunk.
+    margin_low : int
+        Points at the beginning which are not used, 0 for the first chunk.
+    margin_high : int
+        Points at the end which are not used, 0 for the last chunk.
+    ramp : int
+        Number of points over which the weight rises.
+
+    Returns
+    -------
+    weight : np.ndarray
+        Weight for every point of the chunk.
+    """
+    n = np.arange(length) + 0.5
+    weight = np.ones(length)
+    if margin_low or margin_high:
+        ramp = max(ramp, 1)
+    if margin_low:
+        weight = np.minimum(weight, np.clip((n-margin_low) / ramp, 0, 1))
+    if margin_high:
+        weight = np.minimum(weight,
+                            np.clip((length-margin_high-n) / ramp, 0, 1))
+
+    return weight
+
+
+def active_segments(vec: np.ndarray, sensor_dict: dict,
+                    scale: float = 1.0, level: bool = False) -> list:
+    """
+    Finds the parts of a measurement series in which the sensor moves. The
+    variance of the magnitude of vec is calculated over windows of
+    activity_window points. A window is active if the standard deviation is
+    larger than 25*error, every point of an active window and
+    activity_padding points on both sides belong to a segment. Segments
+    which are less than activity_window points apart are joined.
+    The variance does not see a constant value, so for a sensor which
+    measures 0 at rest, like the gyroscope, level also makes every point
+    active whose magnitude is larger than 25*error.
+
+    Parameters
+    ----------
+    vec : np.ndarray
+        The measured values.
+    sensor_dict : dict
+        The dictionary which stores all constants for the sensor.
+    scale : float, optional
+        Factor which converts vec into the unit of error, e.g. 9.81 for in_g.
+        The default is 1.0.
+    level : bool, optional
+        Whether a point is active if its magnitude is larger than 25*error.
+        The default is False.
+
+    Returns
+    -------
+    segments : list
+        (begin, end) of every active segment, in ascending order.
+    """
+    length = len(vec)
+    width = min(max(sensor_dict['activity_window'], 2), length)
+    padding = sensor_dict['activity_padding']
+    magnitude = np.sqrt(np.einsum('ij,ij->i', vec, vec, dtype=np.float64))
+    magnitude *= scale
+    limit = _ACTIVITY_ERRORS * sensor_dict['error']
+    moving = np.flatnonzero(level & (magnitude > limit))
+    magnitude -= magnitude.mean()
+#  Variance of every window from the cumulative sums of m and m**2.
+    sums = np.zeros((length+1, 2))
+    np.cumsum(magnitude, out=sums[1:, 0])
+    np.cumsum(magnitude**2, out=sums[1:, 1])
+    (mean, square) = ((sums[width:] - sums[:-width]) / width).T
+    active = np.flatnonzero(square - mean**2 > limit**2)
+
+#  Number of active windows and points around every point, > 0 is active.
+    count = np.zeros(length+1, dtype=np.int64)
+    np.add.at(count, np.maximum(active - padding, 0), 1)
+    np.add.at(count, np.minimum(active + width + padding, length), -1)
+    np.add.at(count, np.maximum(moving - padding, 0), 1)
+    np.add.at(count, np.minimum(moving + 1 + padding, length), -1)
+    inside = np.cumsum(count[:-1]) > 0
+    edges = np.flatnonzero(np.diff(inside.astype(np.int8), prepend=0,
+                                   append=0))
+    (begin, end) = (edges[0::2], edges[1::2])
+    if begin.size == 0:
+        return []
+    idle = begin[1:] - end[:-1] >= width
+    begin = begin[np.concatenate([[True], idle])]
+    end = end[np.concatenate([idle, [True]])]
+    return list(zip(begin.tolist(), end.tolist()))
+
+
 def _ktest(k: int = 3) -> str:
     """
     Converts the input into a string that can be processed by
@@ -433,3 +902,52 @@ def _ktest(k: int = 3) -> str:
         raise ValueError(f'k is not a valid argument. k can be between 0...3. k={k}')
 
     return res
+
+
+def _active_only(fun, vec: np.ndarray, t: np.ndarray, segments: list,
+                 outputs: tuple, args: tuple, kwargs: dict,
+                 args_later: tuple) -> tuple:
+    """
+    Calls fun(vec, t, *args, **kwargs) for every segment and puts the results
+    together, outside of the segments they are 0. A segment which does not
+    begin with the series gets args_later instead of args, i.e. without the
+    start values. The arrays in kwargs are cut like vec. outputs tells which
+    results are arrays like vec, the others are None. A segment in which fun
+    raises RuntimeWarning stays 0. The second result is t_step of the whole
+    series.
+    """
+    res = [None] * len(outputs)
+    for (begin, end) in segments:
+        try:
+            part = fun(vec[begin:end], t[begin:end],
+                       *(args if begin == 0 else args_later),
+                       **{key: value[begin:end]
+                          for (key, value) in kwargs.items()})
+        except RuntimeWarning:
+            continue
+        for (n, value) in enumerate(part):
+            if outputs[n] and value is not None:
+                if res[n] is None:
+                    res[n] = allocate(vec.shape, value.dtype)
+                res[n][begin:end] = value
+
+    res = [allocate(vec.shape) if value is None and output else value
+           for (value, output) in zip(res, outputs)]
+    res[1] = timestep(t)
+    return tuple(res)
+
+
+def _hold(rot_abs: np.ndarray, segments: list) -> None:
+    """
+    Continues the absolute rotation of every segment from the end of the
+    previous one and keeps it constant between the segments.
+    """
+    offset = np.zeros(rot_abs.shape[1], dtype=rot_abs.dtype)
+    previous = 0
+    for (begin, end) in segments:
+        rot_abs[previous:begin] = offset
+        rot_abs[begin:end] += offset
+        np.fmod(rot_abs[begin:end], 2*np.pi, out=rot_abs[begin:end])
+        offset = rot_abs[end-1].copy()
+        previous = end
+    rot_abs[previous:] = offset
@@ -6,19 +6,29 @@ Version: v0.4-beta
 
 The output_data module stores the calculated data in external files.
 These are:
-    data_storer(), save_to_file(), output_array(), data_array_test(),
-    data_array_first(), data_array_add(), str_edit()
+    data_storer(), config_metadata(), save_binary(), save_to_file(),
+    write_csv(), output_array(), output_table(), str_edit(),
+    _open_new()
 """
 
 
 import os
+import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 import conversions as conv
+import instrument
 
+# Rows which are written at once into parquet and hdf5 files.
+_CHUNK_ROWS = 65536
+# Rows which are formatted at once for csv files.
+_CSV_BLOCK = 4096
 
-def data_storer(data: tuple, formatter: str = '%1.5e') -> None:
+
+def data_storer(data: tuple, formatter: str = '%1.5e',
+                save_format: str = 'csv', config: dict = None) -> None:
     '''
     Save the given data from the tuples in a csv file. It synchronizes the
     measurement series with each other.
@@ -29,6 +39,11 @@ def data_storer(data: tuple, formatter: str = '%1.5e') -> None:
         Data tuple to be saved.
     formatter : str, optional
         In which format the results should be saved. The default is '%1.5e'.
+    save_format : str, optional
+        The file format: csv, npz, parquet or hdf5. The default is 'csv'.
+    config : dict, optional
+        The config which is stored in binary files, see config_metadata. The
+        default is None.
 
     Returns
     -------
@@ -39,28 +54,145 @@ def data_storer(data: tuple, formatter: str = '%1.5e') -> None:
         print('The directory "output" has been created automatically.')
         print('In these will be the saved energy files.\n')
 
-    (E_rot, rot_str, E_trans,
-     trans_str, E_kin, kin_str, filenames) = output_array(data)
+    with instrument.span('output_table'):
+        (E_rot, rot_str, E_trans,
+         trans_str, E_kin, kin_str, _) = output_array(data)
     to_day = str(datetime.now())
     to_day = to_day[:19].replace('-', '_').replace(' ', '-').replace(':', '_')
     print('')
-    if 'Gyroscope' in filenames or 'AccGyr' in filenames:
-        _path = f'output/E_rot_{to_day}.csv'
-        (_, y) = E_rot.shape()
-        E_rot[1:, 1] /= y-2
-        save_to_file(_path, E_rot, rot_str, formatter)
+    jobs = []
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        for (name, E_all, header) in [('E_rot', E_rot, rot_str),
+                                      ('E_trans', E_trans, trans_str),
+                                      ('E_kin', E_kin, kin_str)]:
+            if not E_all.size:
+                continue
+            _path = f'output/{name}_{to_day}'
+            if save_format == 'csv':
+                jobs.append(executor.submit(save_to_file, _path + '.csv',
+                                            E_all, header, formatter))
+            else:
+                jobs.append(executor.submit(save_binary, _path, E_all,
+                                            header, save_format, config))
+
+#  Errors of the threads are raised here.
+    for job in jobs:
+        job.result()
+
+
+def config_metadata(acc_dict: dict, gyr_dict: dict) -> dict:
+    '''
+    Converts the config of the sensors into a form which can be stored as
+    JSON.
+
+    Parameters
+    ----------
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+
+    Returns
+    -------
+    config : dict
+        The config of both sensors.
+    '''
+    config = {}
+    for (section, sensor_dict) in [('ACCELEROMETER', acc_dict),
+                                   ('GYROSCOPE', gyr_dict)]:
+        config[section] = {key: (value.tolist() if isinstance(value, (
+            np.ndarray, np.generic)) else value)
+            for (key, value) in dict(sensor_dict.items()).items()}
+    return config
 
-    if 'Accelerometer' in filenames or 'AccGyr' in filenames:
-        _path = f'output/E_trans_{to_day}.csv'
-        (_, y) = E_trans.shape()
-        E_trans[1:, 1] /= y-2
-        save_to_file(_path, E_trans, trans_str, formatter)
 
-    if 'AccGyr' in filenames:
-        _path = f'output/E_kin_{to_day}.csv'
-        (_, y) = E_kin.shape()
-        E_kin[1:, 1] /= y-2
-        save_to_file(_path, E_kin, kin_str, formatter)
+def save_binary(_path: str, data_to_save: np.ndarray, header: str,
+                save_format: str = 'npz', config: dict = None) -> str:
+    '''
+    Save the given data in a binary file. The names and units of the columns
+    and the config are stored with it. Parquet and HDF5 are written in
+    chunks of _CHUNK_ROWS rows. If pyarrow or h5py is not installed, npz is
+    used.
+
+    Parameters
+    ----------
+    _path : str
+        Location where the file should be saved, without extension.
+    data_to_save : np.ndarray
+        Data to be saved.
+    header : str
+        The names of the columns, separated by commas.
+    save_format : str, optional
+        npz, parquet or hdf5. The default is 'npz'.
+    config : dict, optional
+        The config which is stored with the data. The default is None.
+
+    Raise
+    -----
+    ValueError
+        If the save_format is not known.
+
+    Returns
+    -------
+    _path : str
+        The name of the saved file.
+    '''
+    columns = [column.strip() for column in header.split(',')]
+    metadata = {'columns': columns,
+                'units': ['s'] + ['J'] * (len(columns) - 1),
+                'energy': columns[1],
+                'config': config or {}}
+    if save_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print('pyarrow is not installed, npz is used instead of parquet.')
+            save_format = 'npz'
+    elif save_format == 'hdf5':
+        try:
+            import h5py
+        except ImportError:
+            print('h5py is not installed, npz is used instead of hdf5.')
+            save_format = 'npz'
+    if save_format not in ['npz', 'parquet', 'hdf5']:
+        raise ValueError(f'The save format {save_format} is not known.')
+
+    _path += {'npz': '.npz', 'parquet': '.parquet', 'hdf5': '.h5'}[save_format]
+    with _open_new(_path, 'xb') as file:
+        if save_format == 'npz':
+            np.savez_compressed(file, data=data_to_save,
+                                columns=np.array(columns),
+                                metadata=json.dumps(metadata))
+
+        elif save_format == 'parquet':
+            schema = pa.schema([(column, pa.float64()) for column in columns],
+                               metadata={'mmc': json.dumps(metadata)})
+            with pq.ParquetWriter(file, schema, compression='zstd') as writer:
+                for start in range(0, len(data_to_save), _CHUNK_ROWS):
+                    chunk = data_to_save[start:start+_CHUNK_ROWS]
+                    writer.write_table(pa.Table.from_arrays(
+                        list(chunk.T), schema=schema))
+
+        else:
+            with h5py.File(file, 'w') as h5_file:
+                dataset = h5_file.create_dataset(
+                    'data', shape=data_to_save.shape, dtype='f8',
+                    chunks=(min(_CHUNK_ROWS, len(data_to_save)),
+                            data_to_save.shape[1]),
+                    compression='gzip')
+                for start in range(0, len(data_to_save), _CHUNK_ROWS):
+                    dataset[start:start+_CHUNK_ROWS] = \
+                        data_to_save[start:start+_CHUNK_ROWS]
+                dataset.attrs['columns'] = columns
+                dataset.attrs['units'] = metadata['units']
+                h5_file.attrs['energy'] = metadata['energy']
+                h5_file.attrs['config'] = json.dumps(metadata['config'])
+
+        _path = file.name
+
+    print(f'{_path} saved.')
+    return _path
 
 
 def save_to_file(_path: str, data_to_save: np.ndarray, header: str,
@@ -83,26 +215,64 @@ def save_to_file(_path: str, data_to_save: np.ndarray, header: str,
     -------
     None
     '''
-    try:
-        with open(_path, 'x'):
-            np.savetxt(_path, data_to_save, delimiter=", ", header=header,
-                       fmt=formatter)
+    with _open_new(_path, 'x') as file:
+        write_csv(file, data_to_save, header, formatter)
+        _path = file.name
+
+    print(f'{_path} saved.')
+
+
+def write_csv(file, data_to_save: np.ndarray, header: str,
+              formatter: str = '%1.5e') -> None:
+    '''
+    Writes the data like np.savetxt with the delimiter ', '. Not every row
+    is formatted on its own, but blocks of _CSV_BLOCK rows at once.
+
+    Parameters
+    ----------
+    file : file object
+        The opened file.
+    data_to_save : np.ndarray
+        Data to be saved, 2d.
+    header : str
+        What should be in the header of the file.
+    formatter : str, optional
+        In which format the results should be saved. The default is '%1.5e'.
+
+    Returns
+    -------
+    None
+    '''
+    file.write(f'# {header}\n')
+    row = ', '.join([formatter] * data_to_save.shape[1]) + '\n'
+    for start in range(0, len(data_to_save), _CSV_BLOCK):
+        block = data_to_save[start:start+_CSV_BLOCK]
+        file.write((row * len(block)) % tuple(block.ravel().tolist()))
 
-    except FileExistsError:
-        new_path = _path.replace('.csv', '')
-        new_path += f'_{np.random.randint(0, 1000)}.csv'
-        print(f'{_path} file exists, a new file name has been created.')
-        print(f'New file name: {new_path}.')
-        save_to_file(new_path, data_to_save, header, formatter)
 
-    finally:
-        print(f'{_path} saved.')
+def _open_new(_path: str, mode: str = 'x'):
+    '''
+    Opens a new file. If the file exists, _1, _2, ... is added to the name.
+    Opening with mode x fails if the file exists, so two processes can not
+    get the same name.
+    '''
+    (name, extension) = os.path.splitext(_path)
+    n = 0
+    while True:
+        try:
+            return open(_path, mode)
+        except FileExistsError:
+            n += 1
+            _path = f'{name}_{n}{extension}'
 
 
 def output_array(data: tuple) -> (np.ndarray, str, np.ndarray, str, np.ndarray,
                                   str, str):
     '''
-    Creates the array what should be saved.
+    Creates the array what should be saved. All results are collected first,
+    then every table is allocated once with its final size. The time of the
+    first file of a table is the time of the table, the other files are
+    interpolated to it. The second column is the mean of all files.
 
     Parameters
     ----------
@@ -126,157 +296,68 @@ def output_array(data: tuple) -> (np.ndarray, str, np.ndarray, str, np.ndarray,
     filenames : str
         Name of the files used
     '''
-    _list = [0, 0, 0]
-    rot_str = 'Time in s, rotational energy in J, '
-    trans_str = 'Time in s, translation energy in J, '
-    kin_str = 'Time in s, kenetic energy in J, '
+    columns = {'rot': [], 'trans': [], 'kin': []}
+    headers = {'rot': 'Time in s, rotational energy in J, ',
+               'trans': 'Time in s, translation energy in J, ',
+               'kin': 'Time in s, kenetic energy in J, '}
     filenames = ''
-    E_trans_all = E_rot_all = E_kin_all = np.array([])
-    for singel_data in data:
-        filename = singel_data[0]
+    for (filename, t, E_trans, E_rot, E_kin) in data:
         filenames += filename
-        t = singel_data[1]
-        E_trans = singel_data[2]
-        E_rot = singel_data[3]
-        E_kin = singel_data[4]
-        if 'Gyroscope' in filename:
-            (E_rot_all, rot_str,
-             _list[0]) = data_array_test(E_rot_all, E_rot, t, _list[0],
-                                         rot_str, 'G', filename)
-
+        if t is None:
+            print(f'{filename} has no results to be saved.')
+        elif 'Gyroscope' in filename:
+            columns['rot'].append((t, E_rot, filename, 'G'))
         elif 'Accelerometer' in filename:
-            (E_trans_all, trans_str,
-             _list[1]) = data_array_test(E_trans_all, E_trans, t, _list[1],
-                                         trans_str, 'A', filename)
-
+            columns['trans'].append((t, E_trans, filename, 'A'))
         elif 'AccGyr' in filename:
-            (E_rot_all, rot_str,
-             _list[0]) = data_array_test(E_rot_all, E_rot, t, _list[0],
-                                         rot_str, 'AccGyr', filename)
-            (E_trans_all, trans_str,
-             _list[1]) = data_array_test(E_trans_all, E_trans, t, _list[1],
-                                         trans_str, 'AccGyr', filename)
-            (E_kin_all, kin_str,
-             _list[2]) = data_array_test(E_kin_all, E_kin, t, _list[2],
-                                         kin_str, 'AccGyr', filename)
+            columns['rot'].append((t, E_rot, filename, 'AccGyr'))
+            columns['trans'].append((t, E_trans, filename, 'AccGyr'))
+            columns['kin'].append((t, E_kin, filename, 'AccGyr'))
         else:
             print(f'No saving method is known for {filename}.')
 
-    rot_str = str_edit(rot_str)
-    trans_str = str_edit(trans_str)
-    kin_str = str_edit(kin_str)
-    return (E_rot_all, rot_str, E_trans_all, trans_str, E_kin_all, kin_str,
-            filenames)
+    tables = {}
+    for (energy, column) in columns.items():
+        tables[energy] = output_table(column)
+        for (_, _, filename, check) in column:
+            headers[energy] = conv.string(headers[energy], filename, check)
 
+    return (tables['rot'], str_edit(headers['rot']), tables['trans'],
+            str_edit(headers['trans']), tables['kin'],
+            str_edit(headers['kin']), filenames)
 
-def data_array_test(E_all: np.ndarray, E_add: np.ndarray, t: np.ndarray,
-                    count: int, name_str: str, check: str,
-                    filename: str) -> (np.ndarray, str, int):
-    '''
-    Tests if an array already exists for this energy.
 
-    Parameters
-    ----------
-    E_all : np.ndarray
-        The energy array to which E_all is to be added.
-    E_add : np.ndarray
-        The energy array to be added.
-    t : np.ndarray
-        Time when E_âdd has been measured.
-    count : int
-        Whether this array exists.
-    name_str : str
-        Header string for the used array.
-    check : str
-        Which energy is processed.
-    filename : str
-        Name of the file used.
-
-    Returns
-    -------
-    E_all : np.ndarray
-        Data of the energies processed so far.
-    name_str : str
-        Header string for the used array.
-    check : str
-        Which energy is processed.
+def output_table(column: list) -> np.ndarray:
     '''
-    if count == 0:
-        count = 1
-        (E_all,
-         name_str) = data_array_first(t, E_add, filename, check, name_str)
-
-    else:
-        (E_all,
-         name_str) = data_array_add(E_all, t, E_add, filename, check,
-                                    name_str)
-
-    return (E_all, name_str, count)
-
-
-def data_array_first(t: np.ndarray, E_add: np.ndarray, filename: str,
-                     check: str, name_str: str) -> (np.ndarray, str):
-    '''
-    Tests if an array already exists for this energy.
+    Creates the table of one energy: time, mean of all files, then one column
+    per file.
 
     Parameters
     ----------
-    t : np.ndarray
-        Time when E_âdd has been measured.
-    E_add : np.ndarray
-        The energy array to be added.
-    filename : str
-        Name of the file used.
-    check : str
-        Which energy is processed.
-    name_str : str
-        Header string for the used array.
+    column : list
+        Tuples (t, E, ...) of the files in the order of the columns.
 
     Returns
     -------
     E_all : np.ndarray
-        Data of the energies processed so far.
-    name_str : str
-        Header string for the used array.
+        The table, an empty array if there are no files.
     '''
-    E_all = t
-    name_str = conv.string(name_str, filename, check)
-    E_all = np.c_[E_all, E_add]  # for the total energy
-    return (np.c_[E_all, E_add], name_str)
-
-
-def data_array_add(E_all: np.ndarray, t: np.ndarray, E_add: np.ndarray,
-                   filename: str, check: str,
-                   name_str: str) -> (np.ndarray, str):
-    '''
-    Tests if an array already exists for this energy.
-
-    Parameters
-    ----------
-    E_all : np.ndarray
-        The energy array to which E_all is to be added.
-    t : np.ndarray
-        Time when E_âdd has been measured.
-    E_add : np.ndarray
-        The energy array to be added.
-    filename : str
-        Name of the file used.
-    check : str
-        Which energy is processed.
-    name_str : str
-        Header string for the used array.
+    if not column:
+        return np.array([])
+
+    t_all = column[0][0]
+    E_all = np.empty((len(t_all), len(column) + 2))
+    E_all[:, 0] = t_all
+#  Every file is interpolated on the time of the first file directly into its
+#  column of the table.
+    for (n, (t, E, *_)) in enumerate(column):
+        if t is t_all:
+            E_all[:, n + 2] = E
+        else:
+            E_all[:, n + 2] = np.interp(t_all, t, E)
 
-    Returns
-    -------
-    E_all : np.ndarray
-        Data of the energies processed so far.
-    name_str : str
-        Header string for the used array.
-    '''
-    E_now = np.interp(E_all[:, 0], t, E_add)
-    E_all[:, 1] += E_now
-    name_str = conv.string(name_str, filename, check)
-    return (np.c_[E_all, E_now], name_str)
+    np.mean(E_all[:, 2:], axis=1, out=E_all[:, 1])
+    return E_all
 
 
 def str_edit(name_str: str) -> str:
@@ -19,6 +19,78 @@ GNU General Public License for more details.
 from dataclasses import dataclass
 import numpy as np
 
+
+@dataclass
+class Result:
+    '''
+    The result of one file, see api.run_batch. The energies which are not
+    calculated for the kind of file are None. If the file has failed, t is
+    None and error says why.
+    '''
+    filename: str
+    t: np.ndarray = None
+    E_trans: np.ndarray = None
+    E_rot: np.ndarray = None
+    E_kin: np.ndarray = None
+    error: str = None
+
+    @property
+    def ok(self) -> bool:
+        '''
+        Whether the file has been processed.
+        '''
+        return self.t is not None
+
+    def as_tuple(self) -> tuple:
+        '''
+        The result in the form of processing.main, e.g. for data_storer.
+        '''
+        return (self.filename, self.t, self.E_trans, self.E_rot, self.E_kin)
+
+
+@dataclass
+class Compact:
+    '''
+    A measurement series stored as scaled integers, see Compact.of. The
+    files of the MetaWear sensors have three decimals, so the values are
+    stored without loss as multiples of 0.001 in int16, e.g. up to 32.767 g,
+    or in int32 if they are larger. This needs a quarter or a half of the
+    memory of float64.
+    '''
+    values: np.ndarray
+    decimals: int
+
+    @classmethod
+    def of(cls, vec: np.ndarray, decimals: int = 3):
+        '''
+        Rounds vec to decimals and stores it in the smallest integer type.
+        Values with more decimals, e.g. interpolated ones, are changed by at
+        most half of 10**-decimals.
+        '''
+        values = np.rint(vec * 10.0**decimals)
+        limit = np.abs(values).max(initial=0)
+        for dtype in (np.int16, np.int32):
+            if limit <= np.iinfo(dtype).max:
+                return cls(values.astype(dtype), decimals)
+        return cls(values.astype(np.int64), decimals)
+
+    def array(self, dtype=np.float32) -> np.ndarray:
+        '''
+        The values as a new float array. The division is rounded correctly,
+        so the values are the same as read from the file.
+        '''
+        res = self.values.astype(dtype)
+        res /= dtype(10**self.decimals)
+        return res
+
+    @property
+    def nbytes(self) -> int:
+        '''
+        Memory of the values in bytes.
+        '''
+        return self.values.nbytes
+
+
 @dataclass()
 class Q:
     w: float = 0
@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The instrument module measures how long the stages of the processing take.
+A stage is measured with
+    with instrument.span('read'):
+        ...
+If timing is not enabled, span returns an object which does nothing, so the
+measurement costs only one function call.
+Every process writes its spans as JSON lines into its own file in the folder
+given to enable. The folder is passed to the worker processes with the
+environment variable MMC_TRACE. At the end, report merges the files into one
+trace and prints a summary per stage. Stages can be nested, e.g. intaxis is
+part of rotation and velocity, so the times of nested stages are also
+contained in the time of the outer stage.
+With profiling, every job is run under cProfile in its process and its
+statistics are saved as a .prof file. The folder is passed to the workers
+with MMC_PROFILE. profile_report merges the jobs into one report and writes
+the call stacks in the folded format of flamegraph.pl, speedscope and
+similar tools.
+With memory tracking, every span also records the peak of the memory
+allocated by Python and NumPy while the stage runs, measured with
+tracemalloc, and the peak RSS while the stage runs. On Linux the peak RSS
+of the process is reset for every stage, on other systems it is the peak of
+the process up to the end of the stage. The peak of a stage includes the
+peaks of its nested stages. tracemalloc slows the processing down, so it is
+only started if memory tracking is enabled. The peak RSS is not available
+on Windows.
+These are:
+    enable(), enabled(), span(), report(), collect(), summary(),
+    enable_profile(), profile(), profile_report(), folded(), _Span,
+    _Profile, _write(), _rss_peak(), _reset_rss_peak(), _today()
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import glob
+import threading
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_ENV = 'MMC_TRACE'
+_MEMORY_ENV = 'MMC_TRACE_MEMORY'
+_PROFILE_ENV = 'MMC_PROFILE'
+_NULL = nullcontext()
+# Folder of the trace, None if timing is not enabled.
+_DIR = os.environ.get(_ENV)
+_MEMORY = bool(os.environ.get(_MEMORY_ENV))
+# Folder of the job profiles, None if profiling is not enabled.
+_PROFILE_DIR = os.environ.get(_PROFILE_ENV)
+_PROFILE_COUNT = 0
+# File of this process and the file which is processed now by a thread.
+_FILE = None
+_FILE_PID = None
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+# On Linux the peak RSS is read from VmHWM, which can be reset.
+_HWM = sys.platform.startswith('linux')
+
+
+def enable(directory: str, memory: bool = False) -> str:
+    '''
+    Enables timing for this process and for the processes started later.
+
+    Parameters
+    ----------
+    directory : str
+        Folder for the trace.
+    memory : bool, optional
+        Also record the memory of every span. The default is False.
+
+    Returns
+    -------
+    run_dir : str
+        The folder in which the processes write their spans.
+    '''
+    global _DIR, _MEMORY
+    run_dir = os.path.join(directory, f'run_{os.getpid()}')
+    os.makedirs(run_dir, exist_ok=True)
+    os.environ[_ENV] = run_dir
+    _DIR = run_dir
+    if memory:
+        os.environ[_MEMORY_ENV] = '1'
+        _MEMORY = True
+    return run_dir
+
+
+def enabled() -> bool:
+    '''
+    Tests whether timing is enabled.
+    '''
+    return _DIR is not None
+
+
+def span(stage: str, filename: str = None):
+    '''
+    Measures a stage.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage.
+    filename : str, optional
+        The processed file. The default is the file of the enclosing span
+        which has a filename.
+
+    Returns
+    -------
+    context manager
+        Records the span when it is left.
+    '''
+    if _DIR is None:
+        return _NULL
+    return _Span(stage, filename)
+
+
+def enable_profile(directory: str) -> str:
+    '''
+    Enables profiling of the jobs for this process and for the processes
+    started later.
+
+    Parameters
+    ----------
+    directory : str
+        Folder for the profiles.
+
+    Returns
+    -------
+    run_dir : str
+        The folder of this run, the profiles of the jobs and the report are
+        saved in it.
+    '''
+    global _PROFILE_DIR
+    run_dir = os.path.join(directory, f'profile_{_today()}')
+    os.makedirs(run_dir, exist_ok=True)
+    os.environ[_PROFILE_ENV] = run_dir
+    _PROFILE_DIR = run_dir
+    return run_dir
+
+
+def profile(filename: str):
+    '''
+    Profiles a job with cProfile.
+
+    Parameters
+    ----------
+    filename : str
+        The processed file, it is part of the name of the profile.
+
+    Returns
+    -------
+    context manager
+        Saves the profile when it is left.
+    '''
+    if _PROFILE_DIR is None:
+        return _NULL
+    return _Profile(filename)
+
+
+def profile_report(directory: str = None, width: int = 40) -> str:
+    '''
+    Merges the profiles of all jobs, saves the merged profile, a text report
+    and the folded stacks and prints the most expensive functions.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Folder of the run. The default is the folder of enable_profile.
+    width : int, optional
+        Number of functions in the report. The default is 40.
+
+    Returns
+    -------
+    run_dir : str
+        The folder of the run.
+    '''
+    global _PROFILE_DIR
+    run_dir = _PROFILE_DIR if directory is None else directory
+    os.environ.pop(_PROFILE_ENV, None)
+    _PROFILE_DIR = None
+
+    jobs = sorted(glob.glob(os.path.join(run_dir, 'job_*.prof')))
+    if not jobs:
+        print('No job has been profiled.')
+        return run_dir
+
+    stats = pstats.Stats(*jobs, stream=io.StringIO())
+    stats.dump_stats(os.path.join(run_dir, 'merged.prof'))
+    with open(os.path.join(run_dir, 'report.txt'), 'w') as file:
+        stats.stream = file
+        print(f'{len(jobs)} profiled jobs\n', file=file)
+        stats.sort_stats('cumulative').print_stats(width)
+        stats.sort_stats('tottime').print_stats(width)
+    with open(os.path.join(run_dir, 'stacks.folded'), 'w') as file:
+        file.writelines(f'{stack} {value}\n'
+                        for (stack, value) in folded(stats).items())
+
+    stats.stream = sys.stdout
+    stats.sort_stats('tottime').print_stats(min(width, 15))
+    print(f'{run_dir} saved.')
+    return run_dir
+
+
+def folded(stats: pstats.Stats, max_depth: int = 64,
+           max_visits: int = 100) -> dict:
+    '''
+    Creates call stacks from a profile for a flamegraph.
+    cProfile only saves which function called which, so the time of a
+    function is divided over its callers in proportion to the time which it
+    spent for every caller. A function which is already on the stack is not
+    entered again, so recursion is cut off. Calls with less than 1 µs are
+    skipped and a function is entered at most max_visits times at the same
+    depth, after that its whole time is counted as its own. So the work is
+    bounded by the size of the profile.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        The profile.
+    max_depth : int, optional
+        Maximal depth of a stack. The default is 64.
+    max_visits : int, optional
+        How often a function is entered at the same depth. The default is 100.
+
+    Returns
+    -------
+    stacks : dict
+        The stacks as 'outer;...;inner' and their own time in microseconds.
+    '''
+    def name(func):
+        (path, line, function) = func
+        if path == '~':
+            return function
+        return f'{os.path.basename(path)}:{line}:{function}'
+
+    children = {}
+    for (func, (_, _, _, _, callers)) in stats.stats.items():
+        for (caller, (_, _, _, ct)) in callers.items():
+            children.setdefault(caller, []).append((func, ct))
+
+    stacks = {}
+    visits = {}
+
+    def add(stack, seconds):
+        value = int(seconds * 1e6)
+        if value > 0:
+            key = ';'.join(stack)
+            stacks[key] = stacks.get(key, 0) + value
+
+    def walk(func, stack, share):
+        (_, _, tt, ct, _) = stats.stats[func]
+        if max(tt, ct) * share < 1e-6:
+            return
+        visit = (func, len(stack))
+        visits[visit] = visits.get(visit, 0) + 1
+        stack = stack + [name(func)]
+        if visits[visit] > max_visits:
+            add(stack, max(tt, ct) * share)
+            return
+        add(stack, tt * share)
+        if len(stack) >= max_depth or ct <= 0:
+            return
+        for (child, child_ct) in children.get(func, []):
+            if name(child) not in stack:
+                child_total = stats.stats[child][3]
+                if child_total > 0:
+                    walk(child, stack, share * min(child_ct/child_total, 1.0))
+
+    for (func, (_, _, _, _, callers)) in stats.stats.items():
+        if not callers:
+            walk(func, [], 1.0)
+    return stacks
+
+
+class _Span:
+    '''
+    A measured stage, see span.
+    '''
+    __slots__ = ('stage', 'filename', 'start', 'wall', 'outer', 'parent',
+                 'mem_start', 'mem_peak', 'rss_peak')
+
+    def __init__(self, stage: str, filename: str = None):
+        self.stage = stage
+        self.filename = filename
+
+    def __enter__(self):
+        self.outer = getattr(_LOCAL, 'filename', '')
+        if self.filename is None:
+            self.filename = self.outer
+        else:
+            _LOCAL.filename = self.filename
+        if _MEMORY:
+            self._enter_memory()
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        _LOCAL.filename = self.outer
+        record = {'stage': self.stage, 'file': self.filename,
+                  'start': self.wall, 'duration': duration,
+                  'pid': os.getpid()}
+        if _MEMORY:
+            self._exit_memory(record)
+        _write(record)
+        return False
+
+    def _enter_memory(self):
+        '''
+        tracemalloc and the RSS have only one peak, so they are reset for
+        every span and the peak reached before is kept by the enclosing span.
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        (self.mem_start, peak) = tracemalloc.get_traced_memory()
+        self.parent = getattr(_LOCAL, 'span', None)
+        if self.parent is not None:
+            self.parent.mem_peak = max(self.parent.mem_peak, peak)
+            self.parent.rss_peak = max(self.parent.rss_peak,
+                                       _rss_peak() or 0)
+        self.mem_peak = self.mem_start
+        self.rss_peak = 0
+        _LOCAL.span = self
+        tracemalloc.reset_peak()
+        _reset_rss_peak()
+
+    def _exit_memory(self, record: dict):
+        (current, peak) = tracemalloc.get_traced_memory()
+        peak = max(self.mem_peak, peak)
+        rss = _rss_peak()
+        _LOCAL.span = self.parent
+        if self.parent is not None:
+            self.parent.mem_peak = max(self.parent.mem_peak, peak)
+        record['mem_peak'] = peak - self.mem_start
+        record['mem_delta'] = current - self.mem_start
+        if rss is not None:
+            rss = max(self.rss_peak, rss)
+            if self.parent is not None:
+                self.parent.rss_peak = max(self.parent.rss_peak, rss)
+            record['rss_peak'] = rss
+
+
+class _Profile:
+    '''
+    A profiled job, see profile.
+    '''
+    __slots__ = ('filename', 'profiler')
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global _PROFILE_COUNT
+        self.profiler.disable()
+        _PROFILE_COUNT += 1
+        name = os.path.basename(self.filename).replace('.csv', '')
+        self.profiler.dump_stats(os.path.join(
+            _PROFILE_DIR, f'job_{os.getpid()}_{_PROFILE_COUNT}_{name}.prof'))
+        return False
+
+
+def _write(record: dict) -> None:
+    '''
+    Appends a record to the file of this process. Every line is written at
+    once, so nothing is lost if a worker is terminated.
+    '''
+    global _FILE, _FILE_PID
+    line = json.dumps(record) + '\n'
+    with _LOCK:
+        if _FILE_PID != os.getpid():
+            _FILE = open(os.path.join(_DIR, f'trace_{os.getpid()}.jsonl'),
+                         'a', buffering=1)
+            _FILE_PID = os.getpid()
+        _FILE.write(line)
+
+
+def report(directory: str) -> str:
+    '''
+    Merges the spans of all processes into one trace, saves it in directory
+    and prints the summary.
+
+    Parameters
+    ----------
+    directory : str
+        Folder of the trace, the same as for enable.
+
+    Returns
+    -------
+    _path : str
+        The name of the trace.
+    '''
+    records = collect()
+    _path = os.path.join(directory, f'trace_{_today()}.jsonl')
+    with open(_path, 'w') as file:
+        for record in records:
+            file.write(json.dumps(record) + '\n')
+
+    print('\n' + summary(records))
+    print(f'{_path} saved.')
+    return _path
+
+
+def collect() -> list:
+    '''
+    Merges the spans of all processes and disables timing.
+
+    Returns
+    -------
+    records : list
+        The spans, sorted by their start.
+    '''
+    global _DIR, _MEMORY, _FILE, _FILE_PID
+    if _FILE_PID == os.getpid():
+        _FILE.close()
+    (_FILE, _FILE_PID) = (None, None)
+    records = []
+    for part in glob.glob(os.path.join(_DIR, 'trace_*.jsonl')):
+        with open(part) as file:
+            records += [json.loads(line) for line in file if line.strip()]
+        os.remove(part)
+    os.rmdir(_DIR)
+    os.environ.pop(_ENV, None)
+    os.environ.pop(_MEMORY_ENV, None)
+    _DIR = None
+    if _MEMORY:
+        tracemalloc.stop()
+        _MEMORY = False
+
+    records.sort(key=lambda record: record['start'])
+    return records
+
+
+def summary(records: list) -> str:
+    '''
+    Creates a table with the number, total, mean and maximum time of every
+    stage and, with memory tracking, its largest peak of traced memory and
+    of the RSS in MiB.
+
+    Parameters
+    ----------
+    records : list
+        The spans of the trace.
+
+    Returns
+    -------
+    table : str
+        The summary.
+    '''
+    stages = {}
+    memory = {}
+    for record in records:
+        stages.setdefault(record['stage'], []).append(record['duration'])
+        if 'mem_peak' in record:
+            (peak, rss) = memory.get(record['stage'], (0, 0))
+            memory[record['stage']] = (max(peak, record['mem_peak']),
+                                       max(rss, record.get('rss_peak') or 0))
+
+    mib = 2**20
+    lines = [f'{"stage":<12} {"count":>6} {"total in s":>11} {"mean in s":>10}'
+             f' {"max in s":>9}']
+    if memory:
+        lines[0] += f' {"peak MiB":>9} {"RSS MiB":>8}'
+    for (stage, durations) in sorted(stages.items(),
+                                     key=lambda item: -sum(item[1])):
+        line = (f'{stage:<12} {len(durations):>6} {sum(durations):>11.3f}'
+                f' {sum(durations)/len(durations):>10.4f}'
+                f' {max(durations):>9.4f}')
+        if stage in memory:
+            (peak, rss) = memory[stage]
+            line += f' {peak/mib:>9.1f} {rss/mib:>8.1f}'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def _rss_peak() -> int:
+    '''
+    Returns the peak RSS in bytes, on Linux since the last _reset_rss_peak,
+    otherwise since the start of the process. None on Windows.
+    '''
+    if _HWM:
+        try:
+            with open('/proc/self/status') as file:
+                for line in file:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    if resource is None:
+        return None
+#  ru_maxrss is given in KiB, only on macOS in bytes.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss*1024
+
+
+def _reset_rss_peak() -> None:
+    '''
+    Sets the peak RSS of the process to its current RSS. Only possible on
+    Linux, elsewhere nothing is done.
+    '''
+    if not _HWM:
+        return
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+#  Without the reset VmHWM is the same as ru_maxrss.
+        pass
+
+
+def _today() -> str:
+    '''
+    Returns the date and time for a file name.
+    '''
+    return str(datetime.now())[:19].replace('-', '_').replace(
+        ' ', '-').replace(':', '_')
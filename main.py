@@ -19,30 +19,137 @@ GNU General Public License for more details.
 __version__ = 'v0.4-beta'
 __author__ = 'SmartDust'
 
+import sys
 import time
 import os
+from contextlib import nullcontext, redirect_stdout
 from multiprocessing import Pool, Manager
-from matplotlib import pyplot as plt
+from multiprocessing.util import Finalize
 
-import processing as proces
-import subprocessing as sub
-from config_parser import get_config
-from data_output import data_storer
+import cache
+import service
+from config_parser import get_config, str_gen
 
 
 def main() -> None:
     '''
-    This is the main function of this programm
+    This is the main function of this programm. The modules of the
+    processing are only imported if the files are not processed by the
+    service.
     '''
-    global time_global_start
     (main_dict, acc_dict,
      gyr_dict, graph_dict) = get_config(filename='config.ini')
+    if (main_dict['timing'] or main_dict['trace_memory']
+            or main_dict['profile']):
+        import instrument
+        if main_dict['timing'] or main_dict['trace_memory']:
+            instrument.enable(main_dict['timing_dir'],
+                              memory=main_dict['trace_memory'])
+        if main_dict['profile']:
+            instrument.enable_profile(main_dict['profile_dir'])
+    if main_dict['out_of_core']:
+        import conversions as conv
+        conv.use_scratch(main_dict['scratch_dir'],
+                         main_dict['scratch_threshold'])
 
     if main_dict['filenames_auto']:
-        filenames = proces.str_gen(main_dict['names'],
-                                   main_dict['measurements'])
+        filenames = str_gen(main_dict['names'], main_dict['measurements'])
     else:
         filenames = main_dict['filenames']
+
+#  Results of unchanged files are loaded from the cache.
+    if main_dict['cache']:
+        cache_dir = main_dict['cache_dir']
+        all_filenames = list(filenames)
+        keys = {filename: cache.job_key(filename, acc_dict, gyr_dict)
+                for filename in filenames}
+        cached = {filename: cache.load(cache_dir, keys[filename], filename)
+                  for filename in filenames}
+        filenames = [filename for filename in filenames
+                     if cached[filename] is None]
+        if not filenames:
+            main_dict['multi_processing'] = False
+
+#  The files are given to the service if it is running.
+    data = None
+    if main_dict['service'] or (main_dict['service'] is None and
+                                service.available(main_dict['service_socket'])):
+        data = process_service(filenames, main_dict, acc_dict, gyr_dict,
+                               graph_dict)
+    if data is None and main_dict['pipeline']:
+        import pipeline
+        data = pipeline.process(filenames, main_dict, acc_dict, gyr_dict,
+                                graph_dict)
+        main_dict['multi_processing'] = False
+    if data is None:
+        data = process(filenames, main_dict, acc_dict, gyr_dict, graph_dict)
+
+    if main_dict['cache']:
+        entries = []
+        for data_now in data:
+            filename = data_now[0]
+            cached[filename] = data_now
+            if cache.store(cache_dir, keys[filename], data_now):
+                entries.append((filename, keys[filename], 'computed'))
+            else:
+                entries.append((filename, keys[filename], 'failed'))
+
+        entries += [(filename, keys[filename], 'reused')
+                    for filename in all_filenames if filename not in filenames]
+        cache.write_manifest(cache_dir, entries)
+        if main_dict['multi_processing']:
+            import subprocessing as sub
+            all_filenames.sort(key=sub.filename_sorting_key)
+        data = [cached[filename] for filename in all_filenames]
+
+    if main_dict['save_output']:
+        import instrument
+        from data_output import data_storer, config_metadata
+        time_local_start = time.perf_counter()
+        with instrument.span('output'):
+            data_storer(data, main_dict['save_formatter'],
+                        main_dict['save_format'],
+                        config_metadata(acc_dict, gyr_dict))
+        time_local_end = time.perf_counter()
+        time_local = round((time_local_end - time_local_start), 3)
+        print(f'It took {time_local}s to create the output files.')
+
+    if main_dict['timing'] or main_dict['trace_memory']:
+        instrument.report(main_dict['timing_dir'])
+    if main_dict['profile']:
+        instrument.profile_report()
+
+
+def process(filenames: list, main_dict: dict, acc_dict: dict, gyr_dict: dict,
+            graph_dict: dict) -> list:
+    '''
+    Processes the files with multiprocessing or one after the other.
+
+    Parameters
+    ----------
+    filenames : list
+        The files to be processed. Sorted for multiprocessing.
+    main_dict : dict
+        The dictionary which stores all constants for main.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+
+    Returns
+    -------
+    data : list
+        The results of processing.main.
+    '''
+    import processing as proces
+    import subprocessing as sub
+    import scheduler as sched
+    import render
+    import progress
+
+    global time_global_start
     MMC_LEN = len(filenames)
     data = []
 
@@ -90,22 +197,127 @@ have been specified. This can lead to slower processing.')
 
         iterable = [(filenames[n], acc_dict, gyr_dict, graph_dict)
                     for n in range(MMC_LEN)]
-        with Pool(processes=workers) as pool:
-            pools = pool.starmap_async(proces.main, iterable)
-            data = pools.get()
+#  The graphs are drawn by separate renderer processes.
+        (queue, renderers) = (None, [])
+        if graph_dict['render_processes'] > 0:
+            (queue, renderers) = render.start(graph_dict['render_processes'])
+        monitor = nullcontext()
+        if main_dict['progress']:
+            monitor = progress.Monitor(filenames, main_dict['progress_file'])
+        try:
+            with monitor, Pool(processes=workers, initializer=_init_worker,
+                               initargs=(queue, getattr(monitor, 'queue',
+                                                        None))) as pool:
+                if main_dict['memory_budget'] > 0:
+                    budget = main_dict['memory_budget']
+                    footprints = [sched.estimate_memory(filename, acc_dict)
+                                  for filename in filenames]
+                    print(f'The jobs are started within a memory budget of\
+ {budget:.0f}MB.')
+                    data = sched.budgeted_starmap(pool, proces.main, iterable,
+                                                  footprints, budget, workers)
+                else:
+                    pools = pool.starmap_async(proces.main, iterable)
+                    data = pools.get()
+#  The workers end normally, so they close their files, see _init_worker.
+                pool.close()
+                pool.join()
+        finally:
+            render.stop(queue, renderers)
 
 #  Serial processing of the data.
+    elif main_dict['progress']:
+        with progress.Monitor(filenames, main_dict['progress_file']) as monitor,\
+                open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            progress.connect(monitor.queue)
+            try:
+                for filename in filenames:
+                    data_now = proces.main(filename, acc_dict, gyr_dict,
+                                           graph_dict)
+                    data.append(data_now)
+            finally:
+                progress.connect(None)
+
     else:
         for filename in filenames:
             data_now = proces.main(filename, acc_dict, gyr_dict, graph_dict)
             data.append(data_now)
 
-    if main_dict['save_output']:
-        time_local_start = time.perf_counter()
-        data_storer(data, main_dict['save_formatter'])
-        time_local_end = time.perf_counter()
-        time_local = round((time_local_end - time_local_start), 3)
-        print(f'It took {time_local}s to create the output files.')
+    return data
+
+
+def _init_worker(render_queue, progress_queue) -> None:
+    '''
+    Initializer for the worker processes of the pool, see render.connect and
+    progress.connect. If the progress is shown, the messages of the workers
+    are suppressed, so they do not break the line of the progress. The
+    failed files are shown by the progress.Monitor instead.
+    '''
+    import render
+    import progress
+
+    render.connect(render_queue)
+    progress.connect(progress_queue)
+    if progress_queue is not None:
+        sys.stdout = open(os.devnull, 'w')
+        Finalize(None, _close_stdout, exitpriority=0)
+
+
+def _close_stdout() -> None:
+    '''
+    Closes the redirected output of a worker when the worker ends.
+    '''
+    (devnull, sys.stdout) = (sys.stdout, sys.__stdout__)
+    devnull.close()
+
+
+def process_service(filenames: list, main_dict: dict, acc_dict: dict,
+                    gyr_dict: dict, graph_dict: dict) -> list:
+    '''
+    Processes the files in the service, see service.py.
+
+    Parameters
+    ----------
+    filenames : list
+        The files to be processed.
+    main_dict : dict
+        The dictionary which stores all constants for main.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+
+    Returns
+    -------
+    data : list
+        The results of processing.main or None if the service is not
+        running. If the service stops, the remaining files are processed
+        without it.
+    '''
+    data = [None] * len(filenames)
+    jobs = [(filename, acc_dict, gyr_dict, graph_dict)
+            for filename in filenames]
+    try:
+        for (idx, data_now) in service.submit(jobs,
+                                              main_dict['service_socket']):
+            data[idx] = data_now
+            if data_now[1] is not None:
+                print(f'{filenames[idx]} has been processed by the service.')
+    except ConnectionError as error:
+        rest = [filename for (filename, data_now) in zip(filenames, data)
+                if data_now is None]
+        print(f'{error} {len(rest)} file(s) are processed without it.\n')
+        if len(rest) == len(filenames):
+            return None
+        results = {data_now[0]: data_now for data_now in
+                   process(rest, main_dict, acc_dict, gyr_dict, graph_dict)}
+        data = [results[filename] if data_now is None else data_now
+                for (filename, data_now) in zip(filenames, data)]
+
+    main_dict['multi_processing'] = False
+    return data
 
 
 if __name__ == '__main__':
@@ -114,4 +326,7 @@ if __name__ == '__main__':
     main()
     time_global = round((time.perf_counter() - time_global_start), 3)
     print(f'\nIt took {time_global}s to run the program.')
-    plt.show()
+#  Only if graphs have been drawn, matplotlib has been imported.
+    if 'matplotlib.pyplot' in sys.modules:
+        from matplotlib import pyplot as plt
+        plt.show()
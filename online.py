@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The online module processes the data of a sensor while it is measured. New
+blocks of samples are given with push, which returns the energies of the new
+samples. Only the new samples are processed, the history is kept as a small
+state, so the cost of an update is proportional to the size of the block.
+
+Differences to the processing of a complete file:
+    - The time step is the mean time step of all samples so far, the
+      complete file uses the mean time step of the whole file.
+    - The smoothing is a mean over the last 2*degree_of_spline samples,
+      because the smoothing of conversions.intaxis needs future samples.
+    - The test whether error is too large is not done, a block without
+      movement would fail it.
+The deduplication of equal times and the quantization by error are the same
+as in subprocessing.read and conversions.velocity / conversions.rotation.
+The last sample of a block is only returned with the next block or with
+flush, because it could have the same time as the first sample of the next
+block.
+These are:
+    OnlineAccelerometer, OnlineGyroscope, _OnlineSensor
+"""
+
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class _OnlineSensor(ABC):
+    '''
+    Deduplication and smoothing which are common to all sensors.
+    '''
+
+    def __init__(self, sensor_dict: dict):
+        self.sensor_dict = sensor_dict
+        self.count = 0
+        self._tail_done = 0
+        self._t_tail = np.zeros(0)
+        self._vec_tail = np.zeros((0, 3))
+        self._smooth_tail = np.zeros((0, 3))
+
+    def push(self, t: np.ndarray, vec: np.ndarray) -> (np.ndarray, np.ndarray):
+        '''
+        Processes a new block of samples.
+
+        Parameters
+        ----------
+        t : np.ndarray
+            The column elapsed (s) of the new samples.
+        vec : np.ndarray
+            The x, y, z values of the new samples.
+
+        Returns
+        -------
+        t : np.ndarray
+            Time of the finished samples.
+        energy : np.ndarray
+            Energy of the finished samples.
+        '''
+        t = np.concatenate([self._t_tail, np.asarray(t, dtype=float)])
+        vec = np.concatenate([self._vec_tail,
+                              np.asarray(vec, dtype=float).reshape(-1, 3)])
+        (t_new, vec_new) = self._deduplicate(t, vec, len(t)-1)
+        self._t_tail = t[-2:]
+        self._vec_tail = vec[-2:]
+        self._tail_done = len(self._t_tail) - 1
+        return self._update(t_new, vec_new)
+
+    def flush(self) -> (np.ndarray, np.ndarray):
+        '''
+        Processes the last sample, when the measurement is finished.
+
+        Returns
+        -------
+        t : np.ndarray
+            Time of the last sample.
+        energy : np.ndarray
+            Energy of the last sample.
+        '''
+        (t_new, vec_new) = self._deduplicate(self._t_tail, self._vec_tail,
+                                             len(self._t_tail))
+        self._t_tail = self._t_tail[:0]
+        self._vec_tail = self._vec_tail[:0]
+        self._tail_done = 0
+        return self._update(t_new, vec_new)
+
+    def _deduplicate(self, t: np.ndarray, vec: np.ndarray,
+                     end: int) -> (np.ndarray, np.ndarray):
+        '''
+        Like subprocessing.read: From samples with the same time only the
+        first one is kept, with the mean of the first two. The samples
+        before end are processed, the first one of the tail has already been
+        processed.
+        '''
+        n = np.arange(self._tail_done, end)
+        if len(n) == 0:
+            return (t[:0], vec[:0])
+
+        t_prev = np.where(n > 0, t[n-1], -np.inf)
+        keep = t_prev != t[n]
+        n_next = np.minimum(n+1, len(t)-1)
+        equal = (t[n_next] == t[n]) & (n_next != n)
+        vec_new = np.where(equal[:, np.newaxis], (vec[n] + vec[n_next]) / 2,
+                           vec[n])
+        return (t[n][keep], vec_new[keep])
+
+    def _smooth(self, vec: np.ndarray) -> np.ndarray:
+        '''
+        Mean over the last 2*degree_of_spline samples.
+        '''
+        width = max(2*self.sensor_dict['degree_of_spline'], 1)
+        vec_all = np.concatenate([self._smooth_tail, vec])
+        tail = len(self._smooth_tail)
+        vec_sum = np.cumsum(np.concatenate([np.zeros((1, 3)), vec_all]),
+                            axis=0)
+        end = np.arange(tail, len(vec_all)) + 1
+        begin = np.maximum(end - width, 0)
+        res = ((vec_sum[end] - vec_sum[begin])
+               / (end - begin)[:, np.newaxis])
+        self._smooth_tail = vec_all[-(width-1):] if width > 1 else vec_all[:0]
+        return res
+
+    @abstractmethod
+    def _update(self, t: np.ndarray, vec: np.ndarray) -> (np.ndarray,
+                                                          np.ndarray):
+        '''
+        Calculates the energy of the deduplicated samples of a block.
+        '''
+
+
+class OnlineAccelerometer(_OnlineSensor):
+    '''
+    Calculates the translational energy of an accelerometer online.
+
+    Parameters
+    ----------
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    '''
+
+    def __init__(self, acc_dict: dict):
+        super().__init__(acc_dict)
+        self._v_alt = 0.0
+
+    def _update(self, t: np.ndarray, a: np.ndarray) -> (np.ndarray,
+                                                        np.ndarray):
+        acc_dict = self.sensor_dict
+        if len(t) == 0:
+            return (t, np.zeros(0))
+
+        err = acc_dict['error']
+        a = a.copy()
+        if acc_dict['in_g']:
+            a *= 9.81
+        if err > 0:
+            a = (np.abs(a) // err) * err
+        if acc_dict['g_interfered']:
+            a -= 3.27
+
+#  v[n] = a[n]*dt[n] - v[n-1] is summed with alternating signs:
+#  (-1)^n v[n] = (-1)^(n-1) v[n-1] + (-1)^n a[n]*dt[n]
+        n = np.arange(self.count, self.count + len(t))
+        dt = t / (n + 1)
+        sign = np.where(n % 2 == 0, 1.0, -1.0)[:, np.newaxis]
+        step = sign * a * dt[:, np.newaxis]
+        if self.count == 0:
+            step[0] = acc_dict['start_velocity']
+        v_alt = self._v_alt + np.cumsum(step, axis=0)
+        self._v_alt = v_alt[-1]
+        self.count += len(t)
+
+        v = self._smooth(v_alt * sign)
+        E_trans = 0.5 * acc_dict['m'] * (v[:, 0]**2+v[:, 1]**2+v[:, 2]**2)
+        return (t, E_trans)
+
+
+class OnlineGyroscope(_OnlineSensor):
+    '''
+    Calculates the rotational energy of a gyroscope online.
+
+    Parameters
+    ----------
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    '''
+
+    def _update(self, t: np.ndarray, rot_raw: np.ndarray) -> (np.ndarray,
+                                                              np.ndarray):
+        gyr_dict = self.sensor_dict
+        if len(t) == 0:
+            return (t, np.zeros(0))
+
+        err = gyr_dict['error']
+        rot_raw = rot_raw.copy()
+        if self.count == 0:
+            rot_raw[0, :] = gyr_dict['start_rotation']
+        if gyr_dict['in_grad']:
+            rot_raw *= np.pi/180
+        if err > 0:
+            rot_vel = (np.abs(rot_raw) // err) * err * np.sign(rot_raw)
+        else:
+            rot_vel = rot_raw
+        self.count += len(t)
+
+        rot_vel = self._smooth(rot_vel)
+        omega = np.sqrt(rot_vel[:, 0]**2 + rot_vel[:, 1]**2 + rot_vel[:, 2]**2)
+        E_rot = 0.4 * gyr_dict['m'] * (gyr_dict['r']**2) * omega**2
+        return (t, E_rot)
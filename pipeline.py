@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The pipeline module processes a batch of files in three stages which run at
+the same time:
+    read     in a pool of threads (pipeline_readers), the disk is waiting
+    compute  in a pool of max_processes processes
+    graph    in a pool of pipeline_writers processes, plots and saves
+The stages are connected by queues which hold at most pipeline_depth files.
+If a later stage is slower, the earlier one waits, so not more files are in
+memory than the queues can hold. Graphs are only saved, not shown.
+The .csv output is still written by data_output.data_storer at the end,
+because it combines all files.
+A file is computed by processing.job like in the serial processing, so the
+stages are measured by instrument and the progress is shown.
+These are:
+    process(), run(), _init_worker(), _close_stdout(), _graph()
+"""
+
+import os
+import sys
+import asyncio
+from functools import partial
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+import numpy as np
+
+import processing as proces
+import subprocessing as sub
+import instrument
+import progress
+
+_DONE = None
+
+
+def process(filenames: list, main_dict: dict, acc_dict: dict, gyr_dict: dict,
+            graph_dict: dict) -> list:
+    '''
+    Processes the files with the pipeline.
+
+    Parameters
+    ----------
+    filenames : list
+        The files to be processed.
+    main_dict : dict
+        The dictionary which stores all constants for main.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+
+    Returns
+    -------
+    data : list
+        The results in the same form as processing.main, in the order of
+        filenames.
+    '''
+    graph_dict = dict(graph_dict)
+    if graph_dict['do_graph']:
+        graph_dict['save_graph'] = True
+        os.makedirs('saved_graphs', exist_ok=True)
+
+    print(f'The pipeline has been started with {main_dict["pipeline_readers"]}\
+ reader(s), {main_dict["max_processes"]} process(es) and\
+ {main_dict["pipeline_writers"]} writer(s).')
+    stages = partial(run, filenames, acc_dict, gyr_dict, graph_dict,
+                     main_dict['pipeline_readers'], main_dict['max_processes'],
+                     main_dict['pipeline_writers'],
+                     main_dict['pipeline_depth'])
+    if not main_dict['progress']:
+        return asyncio.run(stages())
+
+#  The messages are suppressed, so they do not break the line of the progress.
+    with progress.Monitor(filenames, main_dict['progress_file']) as monitor,\
+            open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        progress.connect(monitor.queue)
+        try:
+            return asyncio.run(stages(monitor.queue))
+        finally:
+            progress.connect(None)
+
+
+async def run(filenames: list, acc_dict: dict, gyr_dict: dict,
+              graph_dict: dict, readers: int = 2, workers: int = 1,
+              writers: int = 1, depth: int = 4,
+              progress_queue=None) -> list:
+    '''
+    Connects the three stages with bounded queues and waits until all files
+    are finished.
+
+    Parameters
+    ----------
+    filenames : list
+        The files to be processed.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+    readers : int, optional
+        Number of threads which read. The default is 2.
+    workers : int, optional
+        Number of processes which compute. The default is 1.
+    writers : int, optional
+        Number of processes which plot. The default is 1.
+    depth : int, optional
+        How many files each queue can hold. The default is 4.
+    progress_queue : SimpleQueue, optional
+        Queue of the progress.Monitor, the processes which compute report to
+        it. The default is None.
+
+    Returns
+    -------
+    data : list
+        The results in the order of filenames.
+    '''
+    loop = asyncio.get_running_loop()
+    read_queue = asyncio.Queue(maxsize=depth)
+    graph_queue = asyncio.Queue(maxsize=depth)
+    data = [None] * len(filenames)
+    todo = asyncio.Queue()
+    for job in enumerate(filenames):
+        todo.put_nowait(job)
+
+    with ThreadPoolExecutor(max_workers=readers) as read_pool, \
+            ProcessPoolExecutor(max_workers=workers,
+                                initializer=_init_worker,
+                                initargs=(progress_queue,)) as cpu_pool, \
+            ProcessPoolExecutor(max_workers=writers,
+                                initializer=sub.ignore_interrupt) as graph_pool:
+
+        async def read():
+            while not todo.empty():
+                (idx, filename) = todo.get_nowait()
+                try:
+                    loaded = await loop.run_in_executor(
+                        read_pool,
+                        partial(proces.load, **proces.window(acc_dict)),
+                        filename, acc_dict['threads'], acc_dict['compact'])
+                except Exception as error:
+                    print(f'{filename} could not be read: {error!r}')
+                    loaded = None
+                if loaded is None:
+                    data[idx] = (filename, None, None, None, None)
+                    progress.report('failed', filename)
+                    continue
+                await read_queue.put((idx, filename, loaded))
+
+        async def compute():
+            while (job := await read_queue.get()) is not _DONE:
+                (idx, filename, loaded) = job
+#  A failed file must not stop the task, else the readers wait forever.
+                try:
+                    (data[idx], xyz) = await loop.run_in_executor(
+                        cpu_pool, partial(proces.job, loaded=loaded,
+                                          draw=False),
+                        filename, acc_dict, gyr_dict, graph_dict)
+                except Exception as error:
+                    print(f'{filename} has failed: {error!r}')
+                    data[idx] = (filename, None, None, None, None)
+                    continue
+                if graph_dict['do_graph'] and data[idx][1] is not None:
+                    await graph_queue.put((data[idx], xyz))
+
+        async def graph():
+            while (job := await graph_queue.get()) is not _DONE:
+                try:
+                    await loop.run_in_executor(graph_pool, _graph, *job,
+                                               graph_dict)
+                except Exception as error:
+                    print(f'The graph of {job[0][0]} has failed: {error!r}')
+
+        computing = [asyncio.create_task(compute()) for _ in range(workers)]
+        graphing = [asyncio.create_task(graph()) for _ in range(writers)]
+        await asyncio.gather(*[read() for _ in range(readers)])
+        for _ in computing:
+            await read_queue.put(_DONE)
+        await asyncio.gather(*computing)
+        for _ in graphing:
+            await graph_queue.put(_DONE)
+        await asyncio.gather(*graphing)
+
+    return data
+
+
+def _init_worker(progress_queue) -> None:
+    '''
+    Initializer for the processes which compute, see sub.ignore_interrupt
+    and progress.connect. If the progress is shown, the messages of the
+    processes are suppressed.
+    '''
+    sub.ignore_interrupt()
+    progress.connect(progress_queue)
+    if progress_queue is not None:
+        sys.stdout = open(os.devnull, 'w')
+        Finalize(None, _close_stdout, exitpriority=0)
+
+
+def _close_stdout() -> None:
+    '''
+    Closes the redirected output of a process when it ends.
+    '''
+    (devnull, sys.stdout) = (sys.stdout, sys.__stdout__)
+    devnull.close()
+
+
+def _graph(data: tuple, xyz: np.ndarray, graph_dict: dict) -> None:
+    '''
+    Saves the graphs of a file with processing.graphs.
+    '''
+    from matplotlib import pyplot as plt
+
+    with instrument.span('graph', data[0]):
+        proces.graphs(data, xyz, graph_dict)
+    plt.close('all')
@@ -7,14 +7,21 @@ Version: v0.4-beta
 The Processing module contains all functions responsible for the direct
 processing of raw data.
 These are:
-    main(), accelerometer(), gyroscope(), accgyr(), failed(), str_gen()
+    main(), job(), read(), energies(), graphs(), load(), window(),
+    compute_dtype(), expand(), failed(), _stage(), _translational(),
+    _rotational()
 """
 
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 import subprocessing as sub
+from datatyp import Compact
 import conversions as conv
+import instrument
+import progress
 
 
 def main(filename: str, acc_dict: dict, gyr_dict: dict,
@@ -39,209 +46,401 @@ def main(filename: str, acc_dict: dict, gyr_dict: dict,
         The calculated energies for the processed file.
 
     '''
-    if 'Accelerometer' in filename:
-        (E_trans, t) = accelerometer(filename, acc_dict, graph_dict)
-        data = (filename, t, E_trans, None, None)
-
-    elif 'Gyroscope' in filename:
-        (E_rot, t) = gyroscope(filename, gyr_dict, graph_dict)
-        data = (filename, t, None, E_rot, None)
-
-    elif 'AccGyr' in filename:
-        (E_trans, E_rot,
-         E_kin, t) = accgyr(filename, acc_dict, gyr_dict, graph_dict)
-        data = (filename, t, E_trans, E_rot, E_kin)
-
-    else:
-        failed(filename)
-        data = (filename, None, None, None, None)
-
-    return data
+    return job(filename, acc_dict, gyr_dict, graph_dict)[0]
 
 
-def accelerometer(filename: str, acc_dict: dict, graph_dict: dict) -> (
-        np.ndarray, np.ndarray):
+def job(filename: str, acc_dict: dict, gyr_dict: dict, graph_dict: dict,
+        loaded: tuple = None, draw: bool = True) -> (tuple, np.ndarray):
     """
-    Read the file of the accelerometer and calculate the speed from it.
-    From this the translations energy is calculated and output as a
-    diagram over time.
+    Processes one file as a job: the progress is reported, the job is
+    measured by instrument, the file is read if it is not given, the energies
+    are calculated and the graphs are drawn.
 
     Parameters
     ----------
     filename : str
-        The name of the file to be evaluated.
+        Name of the file being processed.
     acc_dict : dict
         The dictionary which stores all constants for the accelerometer.
-    graph_dict : dict, madatory
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
         The dictionary which stores all constants for the graph.
+    loaded : tuple, optional
+        The file as read by read or load, a file read by load with compact is
+        expanded to compute_dtype of the accelerometer. The default is None,
+        then the file is read.
+    draw : bool, optional
+        Whether the graphs are drawn here. If not, the trajectory is still
+        calculated for them with do_graph. The default is True.
 
     Returns
     -------
-    E_trans : np.ndarray
-        Translational energy.
-    t : np.ndarray
-        Time of measurement for the individual translation energies.
-    """
-    time_local_start = time.perf_counter()
-    print(f'{filename}: ', end='')
-    (t, a) = sub.read(filename)
-    (v, t_step) = conv.velocity(a=a, t=t, acc_dict=acc_dict)
-    E_trans = 0.5 * acc_dict['m'] * (v[:, 0]**2+v[:, 1]**2+v[:, 2]**2)
-    if graph_dict['do_graph']:
-        sub.graph2d(t=t, y=E_trans, typ='trans', filename=filename,
-                    string_check='A', graph_dict=graph_dict)
-        if acc_dict['trajectory']:
-            xyz = conv.xyz(t_step, v)
-            sub.graph3d(xyz=xyz, filename=filename, string_check='A',
-                        graph_dict=graph_dict)
-
-    time_local_end = time.perf_counter()
-    time_local = round((time_local_end - time_local_start), 3)
-    print(f'took {time_local}s to process.')
-    return (E_trans, t)
+    data : tuple
+        (filename, t, E_trans, E_rot, E_kin), None for the energies which
+        are not calculated or if the file cannot be processed.
+    xyz : np.ndarray
+        The trajectory if it is needed for the graphs, otherwise None.
+    """
+    progress.report('start', filename)
+    try:
+        with instrument.span('job', filename), instrument.profile(filename):
+            time_local_start = time.perf_counter()
+            if 'AccGyr' in filename:
+                sensorname = os.path.basename(filename).replace(
+                    '_AccGyr.csv', '')
+                print(f'From {sensorname} the gyroscope and accelerometer: ',
+                      end='')
+            else:
+                print(f'{filename}: ', end='')
+            if loaded is None:
+                loaded = read(filename, acc_dict, gyr_dict)
+            elif acc_dict['compact']:
+                loaded = expand(loaded, compute_dtype(acc_dict))
+            if loaded is None:
+                (data, xyz) = ((filename, None, None, None, None), None)
+            else:
+                (data, xyz) = energies(filename, loaded, acc_dict, gyr_dict,
+                                       graph_dict['do_graph']
+                                       and acc_dict['trajectory'])
+                if draw and graph_dict['do_graph']:
+                    with instrument.span('graph'):
+                        graphs(data, xyz, graph_dict)
+
+                time_local_end = time.perf_counter()
+                time_local = round((time_local_end - time_local_start), 3)
+                print(f'took {time_local}s to process.')
+    except Exception:
+        progress.report('failed', filename)
+        raise
+
+    if data[1] is None:
+        progress.report('failed', filename)
+    else:
+        progress.report('done', filename, len(data[1]))
+    return (data, xyz)
 
 
-def gyroscope(filename: str, gyr_dict: dict, graph_dict: dict) -> (np.ndarray,
-                                                                   np.ndarray):
+def read(filename: str, acc_dict: dict, gyr_dict: dict) -> tuple:
     """
-    Reads the file of the gyroscope. The rotation energy is then calculated
-    from this. BUT it is calculated for a solid full sphere, so for everything
-    but a sphere very poorly suited. The rotational energy is output as a graph
-    over time.
+    Reads a file for energies. The measured values are read in the type of
+    compute_dtype, for AccGyr both files are read and synchronized.
 
     Parameters
     ----------
     filename : str
-        The name of the file to be evaluated.
+        Name of the file being read.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
     gyr_dict : dict
         The dictionary which stores all constants for the gyroscope.
-    graph_dict : dict, madatory
-        The dictionary which stores all constants for the graph.
 
     Returns
     -------
-    E_rot : np.ndarray
-        Rotational energy.
-    t : np.ndarray
-        Time of measurement for the individual translation energies.
-    """
-    time_local_start = time.perf_counter()
-    print(f'{filename}: ', end='')
-    (t, rot_raw) = sub.read(filename)
-    (rot_vel, _, _) = conv.rotation(rot_raw, t, rot_mode='v', gyr_dict=gyr_dict)
-    omega = np.sqrt(rot_vel[:, 0]**2 + rot_vel[:, 1]**2 + rot_vel[:, 2]**2)
-    E_rot = 0.4 * gyr_dict['m'] * (gyr_dict['r']**2) * omega**2
-    if graph_dict['do_graph']:
-        sub.graph2d(t=t, y=E_rot, typ='rot', filename=filename,
-                    string_check='G', graph_dict=graph_dict)
+    loaded : tuple
+        (t, a), (t, rot_raw) or (t, rot_raw, a). None if no analysis method
+        is known for the file.
+    """
+    if 'AccGyr' in filename:
+        with instrument.span('read'):
+            (t_gyr, rot_raw) = sub.read(
+                filename.replace('AccGyr', 'Gyroscope'),
+                dtype=compute_dtype(gyr_dict), **window(gyr_dict))
+            (t_acc, a) = sub.read(filename.replace('AccGyr', 'Accelerometer'),
+                                  dtype=compute_dtype(acc_dict),
+                                  **window(acc_dict))
+        with instrument.span('synchronize'):
+            return sub.synchronize(t_gyr, rot_raw, t_acc, a,
+                                   threads=acc_dict['threads'])
+
+    elif 'Accelerometer' in filename:
+        with instrument.span('read'):
+            return sub.read(filename, dtype=compute_dtype(acc_dict),
+                            **window(acc_dict))
 
-    time_local_end = time.perf_counter()
-    time_local = round((time_local_end - time_local_start), 3)
-    print(f'took {time_local}s to process.')
-    return (E_rot, t)
+    elif 'Gyroscope' in filename:
+        with instrument.span('read'):
+            return sub.read(filename, dtype=compute_dtype(gyr_dict),
+                            **window(gyr_dict))
+
+    failed(filename)
+    return None
 
 
-def accgyr(filename: str, acc_dict: dict, gyr_dict: dict, graph_dict: dict) -> (
-        np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+def energies(filename: str, loaded: tuple, acc_dict: dict, gyr_dict: dict,
+             trajectory: bool = False, stage=None) -> (tuple, np.ndarray):
     """
-    Reads the data from the gyroscope and the accelerometer. Calculated the
-    rotational energy and the translational energy and subtracted the angular
-    acceleration from the measured acceleration.
+    Calculates the energies of a read file. For the accelerometer the speed
+    is calculated and from it the translational energy. For the gyroscope
+    the rotational energy, BUT it is calculated for a solid full sphere, so
+    for everything but a sphere very poorly suited. For AccGyr the angular
+    acceleration is subtracted from the measured acceleration, the rotational
+    energy uses m and r of the accelerometer.
 
     Parameters
     ----------
     filename : str
-        The name of the file to be evaluated.
+        Name of the file, it decides which energies are calculated.
+    loaded : tuple
+        (t, a), (t, rot_raw) or (t, rot_raw, a) as np.ndarray, see read.
     acc_dict : dict
         The dictionary which stores all constants for the accelerometer.
     gyr_dict : dict
         The dictionary which stores all constants for the gyroscope.
-    graph_dict : dict, madatory
-        The dictionary which stores all constants for the graph.
+    trajectory : bool, optional
+        Whether the trajectory is calculated. The default is False.
+    stage : function, optional
+        Runs the stages rotation and velocity as
+        stage(name, depends, fun, *args, **kwargs), where depends are the
+        config dictionaries the stage depends on. The default is None, then
+        every stage is measured by instrument.span.
 
     Returns
     -------
-    E_trans : np.ndarray
-        Translational energy.
-    E_rot : np.ndarray
-        Rotational energy.
-    E_kin : np.ndarray
-        Kenetic energy
-    t : np.ndarray
-        Time of measurement for the individual energies.
-    """
-    time_local_start = time.perf_counter()
-    sensorname = filename.replace("_AccGyr.csv", "").replace("input/", "")
-    print(f'From {sensorname} the gyroscope and accelerometer: ', end='')
-    filename_gyr = f'input/{sensorname}_Gyroscope.csv'
-    (t_gyr, rot_raw) = sub.read(filename_gyr)
-    filename_acc = f'input/{sensorname}_Accelerometer.csv'
-    (t_acc, a) = sub.read(filename_acc)
-    (t, rot_raw, a) = sub.synchronize(t_gyr, rot_raw, t_acc, a)
-    (rot_vel, _, rot_abs) = conv.rotation(rot_raw, t, rot_mode='c',
-                                          gyr_dict=gyr_dict)
-    (v, t_step) = conv.velocity(a, t, acc_dict, rot_abs=rot_abs,
-                                rot_vel=rot_vel)
-    xyz = conv.xyz(t_step, v)
+    data : tuple
+        (filename, t, E_trans, E_rot, E_kin), None for the energies which
+        are not calculated.
+    xyz : np.ndarray
+        The trajectory if it is calculated, otherwise None.
+    """
+    if stage is None:
+        stage = _stage
+    (E_trans, E_rot, E_kin, xyz_future) = (None, None, None, None)
+    if 'AccGyr' in filename:
+        (t, rot_raw, a) = loaded
+        (rot_vel, _, rot_abs) = stage('rotation', gyr_dict, conv.rotation,
+                                      rot_raw, t, 'c', gyr_dict)
+        (v, t_step) = stage('velocity', [acc_dict, gyr_dict], conv.velocity,
+                            a, t, acc_dict, rot_abs=rot_abs, rot_vel=rot_vel)
+#  The trajectory is calculated in a second thread next to the energies.
+        if trajectory and acc_dict['threads'] > 1:
+            executor = ThreadPoolExecutor(max_workers=1)
+            xyz_future = executor.submit(conv.xyz, t_step, v)
+            executor.shutdown(wait=False)
+        E_rot = _rotational(rot_vel, acc_dict)
+        E_trans = _translational(v, acc_dict)
+        E_kin = E_trans + E_rot
+
+    elif 'Accelerometer' in filename:
+        (t, a) = loaded
+        (v, t_step) = stage('velocity', acc_dict, conv.velocity, a, t,
+                            acc_dict)
+        E_trans = _translational(v, acc_dict)
+
+    else:
+        (t, rot_raw) = loaded
+        (rot_vel, _, _) = stage('rotation', gyr_dict, conv.rotation, rot_raw,
+                                t, 'v', gyr_dict)
+        E_rot = _rotational(rot_vel, gyr_dict)
+        trajectory = False
+
+    xyz = None
+    if trajectory:
+        with instrument.span('xyz'):
+            if xyz_future is None:
+                xyz = conv.xyz(t_step, v)
+            else:
+                xyz = xyz_future.result()
+
+    return ((filename, t, E_trans, E_rot, E_kin), xyz)
 
-    omega = np.sqrt(rot_vel[:, 0]**2 + rot_vel[:, 1]**2 + rot_vel[:, 2]**2)
-    E_rot = 0.4 * acc_dict['m'] * (acc_dict['r']**2) * omega**2
-    E_trans = 0.5 * acc_dict['m'] * (v[:, 0]**2+v[:, 1]**2+v[:, 2]**2)
-    E_kin = E_trans + E_rot
 
-    if graph_dict['do_graph']:
+def graphs(data: tuple, xyz: np.ndarray, graph_dict: dict) -> None:
+    """
+    Draws the graphs of the energies of a file and of its trajectory.
+
+    Parameters
+    ----------
+    data : tuple
+        The result of energies.
+    xyz : np.ndarray
+        The trajectory, None if it is not drawn.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+    """
+    (filename, t, E_trans, E_rot, E_kin) = data
+    filename_acc = filename.replace('AccGyr', 'Accelerometer')
+    filename_gyr = filename.replace('AccGyr', 'Gyroscope')
+    if E_trans is not None:
         sub.graph2d(t, E_trans, typ='trans', filename=filename_acc,
                     string_check='A', graph_dict=graph_dict)
+    if E_rot is not None:
         sub.graph2d(t=t, y=E_rot, typ='rot', filename=filename_gyr,
                     string_check='G', graph_dict=graph_dict)
+    if E_kin is not None:
         sub.graph2d(t, E_kin, 'kin', graph_dict, filename_acc, 'A')
-        if acc_dict['trajectory']:
-            sub.graph3d(xyz=xyz, string_check='A', filename=filename_acc,
-                        graph_dict=graph_dict)
+    if xyz is not None:
+        sub.graph3d(xyz=xyz, string_check='A', filename=filename_acc,
+                    graph_dict=graph_dict)
+
 
-    time_local_end = time.perf_counter()
-    time_local = round((time_local_end - time_local_start), 3)
-    print(f'took {time_local}s to process.')
-    return (E_trans, E_rot, E_kin, t)
+def _stage(name: str, depends: object, fun, *args, **kwargs):
+    """
+    Runs a stage of energies and measures it.
+    """
+    with instrument.span(name):
+        return fun(*args, **kwargs)
 
 
-def failed(filename: str) -> None:
+def _translational(v: np.ndarray, acc_dict: dict) -> np.ndarray:
     """
-    A function that is only there to say that there is no analysis method
-    known.
+    Translational energy 1/2 m v**2.
+    """
+    return 0.5 * acc_dict['m'] * (v[:, 0]**2+v[:, 1]**2+v[:, 2]**2)
+
+
+def _rotational(rot_vel: np.ndarray, sensor_dict: dict) -> np.ndarray:
+    """
+    Rotational energy of a solid full sphere, 2/5 m r**2 omega**2.
+    """
+    omega = np.sqrt(rot_vel[:, 0]**2 + rot_vel[:, 1]**2 + rot_vel[:, 2]**2)
+    return 0.4 * sensor_dict['m'] * (sensor_dict['r']**2) * omega**2
+
+
+def load(filename: str, threads: int = 1, compact: bool = False,
+         t_start: float = None, t_end: float = None,
+         stride: int = 1000) -> tuple:
+    """
+    Reads a file without processing it. For AccGyr both files are read and
+    synchronized.
 
     Parameters
     ----------
     filename : str
-        The name of the file to be evaluated.
+        The name of the file to be read.
+    threads : int, optional
+        How many threads synchronize the axes. The default is 1.
+    compact : bool, optional
+        Store the series as datatyp.Compact, so a read file needs a quarter
+        to a half of the memory until it is processed. The values which are
+        averaged by sub.read or interpolated by sub.synchronize are rounded
+        to the resolution of the file, 0.001. The default is False.
+    t_start, t_end, stride : optional
+        The time window which is read, see sub.read and window. The default
+        is the whole file.
+
+    Returns
+    -------
+    loaded : tuple
+        (t, vec) of the file, for AccGyr (t, rot_raw, a). None if the file
+        could not be read. See expand.
     """
-    print(f'No analysis method is known for {filename}. Please check.')
-    print('However, other files are still being analyzed.')
+    span = {'t_start': t_start, 't_end': t_end, 'stride': stride}
+    with instrument.span('read', filename):
+        try:
+            if 'AccGyr' in filename:
+                (t_gyr, rot_raw) = sub.read(
+                    filename.replace('AccGyr', 'Gyroscope'), **span)
+                (t_acc, a) = sub.read(
+                    filename.replace('AccGyr', 'Accelerometer'), **span)
+                loaded = sub.synchronize(t_gyr, rot_raw, t_acc, a,
+                                         threads=threads)
+
+            elif 'Accelerometer' in filename or 'Gyroscope' in filename:
+                loaded = sub.read(filename, **span)
+
+            else:
+                failed(filename)
+                return None
+
+        except OSError as error:
+            print(f'{filename} could not be read: {error}')
+            return None
+
+    if compact:
+        loaded = tuple(Compact.of(vec) for vec in loaded)
+    return loaded
+
+
+def window(sensor_dict: dict) -> dict:
+    """
+    The time window of the config for sub.read and load.
+
+    Parameters
+    ----------
+    sensor_dict : dict
+        The dictionary which stores all constants for the sensor.
+
+    Returns
+    -------
+    span : dict
+        t_start, t_end and stride. None for t_start and t_end is the whole
+        file.
+    """
+    return {'t_start': sensor_dict['t_start'], 't_end': sensor_dict['t_end'],
+            'stride': sensor_dict['index_stride']}
 
 
-def str_gen(mmc_names: list, measurements: list,
-            location: str = 'input/') -> list:
+def compute_dtype(sensor_dict: dict) -> type:
     """
-    This function creates the input string.
+    Type in which the measured values of the sensor are processed: float32
+    with the config option compact, otherwise float64.
+    The time stays float64, because its resolution of 1 ms is only kept by
+    float32 up to about 8000 s.
+    Accuracy of compact, compared with float64: float32 keeps 7
+    significant digits, the files have 4 to 5. The velocity, the smoothing
+    and the angular velocity are calculated in float32, the absolute
+    rotation, the time steps and the trajectory in float64. For the
+    recordings in input/ the energies differ by at most this part of their
+    maximum:
+        integration mode   accelerometer   gyroscope   AccGyr
+        a                  5e-6            3e-7        3e-7
+        i                  6e-5            2e-7        4e-6
+    With the integration mode s the smoothing spline often does not converge
+    (the maximal number of iterations is reached), so there is no bound:
+    on 10 s of input/ the energies differ by up to 2e-1 of their maximum
+    and can be nan in one of the types. Do not use compact with s.
 
     Parameters
     ----------
-    mmc_names : list
-        Names of the chips used.
-    measurements : list
-        What measurements have been made.
-    location : str, optional
-        Folder in which the data is stored. The default ist 'input/'
+    sensor_dict : dict
+        The dictionary which stores all constants for the sensor.
 
     Returns
     -------
-    filenames : list
-        List which contain the data strings
+    dtype : type
+        np.float32 or np.float64.
     """
-    filenames = []
-    for name in mmc_names:
-        for measured in measurements:
-            fstring = f'{location}{name}_{measured}.csv'
-            filenames.append(fstring)
+    return np.float32 if sensor_dict['compact'] else np.float64
 
-    return filenames
+
+def expand(loaded: tuple, dtype=np.float64) -> tuple:
+    """
+    Returns new arrays of a file read by load, which may be changed. The
+    time is float64, the measured values are of type dtype.
+
+    Parameters
+    ----------
+    loaded : tuple
+        The result of load.
+    dtype : type, optional
+        Type of the measured values, see compute_dtype. The default is
+        np.float64.
+
+    Returns
+    -------
+    loaded : tuple
+        (t, vec) or (t, rot_raw, a) as np.ndarray.
+    """
+    res = []
+    for (n, vec) in enumerate(loaded):
+        dtype_now = np.float64 if n == 0 else dtype
+        if isinstance(vec, Compact):
+            res.append(vec.array(dtype_now))
+        else:
+            res.append(vec.astype(dtype_now))
+    return tuple(res)
+
+
+def failed(filename: str) -> None:
+    """
+    A function that is only there to say that there is no analysis method
+    known.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file to be evaluated.
+    """
+    print(f'No analysis method is known for {filename}. Please check.')
+    print('However, other files are still being analyzed.')
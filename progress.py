@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The progress module shows the progress of a batch while it is processed.
+The worker processes send one message when they start a file and one when
+they have finished it. The Monitor of the main process collects them in a
+thread and shows one updating line with the finished and the remaining
+files, the processed samples per second, the estimated remaining time and
+what every worker is doing. The messages of the workers are suppressed, so
+a failed file is shown above the line when it is reported and all failed
+files are listed again below the line at the end. The same information is
+written as JSON to a file, so other programs can follow the batch.
+The remaining time is estimated from the number of rows of the files, see
+scheduler.estimate_rows, so a long file counts more than a short one.
+These are:
+    Monitor, connect(), connected(), report(), _rows()
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+from multiprocessing import SimpleQueue
+
+import scheduler as sched
+
+# Queue to the monitor, if this process is connected to one.
+_QUEUE = None
+
+
+class Monitor:
+    '''
+    Collects the messages of the workers and shows the progress.
+
+    Parameters
+    ----------
+    filenames : list
+        The files of the batch.
+    path : str, optional
+        File for the progress as JSON. The default is 'progress.json'.
+    interval : float, optional
+        Minimal time in s between two updates of the line and the file.
+        The default is 0.5.
+    stream : file, optional
+        Where the line is shown. The default is sys.stdout.
+    '''
+
+    def __init__(self, filenames: list, path: str = 'progress.json',
+                 interval: float = 0.5, stream=None):
+        self.queue = SimpleQueue()
+        self.path = path
+        self.interval = interval
+        self.stream = sys.stdout if stream is None else stream
+        self.rows = {filename: _rows(filename) for filename in filenames}
+        self.rows_total = sum(self.rows.values())
+        self.rows_done = 0
+        self.samples = 0
+        self.done = 0
+        self.failed = []
+        self.workers = {}
+        self.start = None
+        self.shown = 0.0
+        self.thread = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.thread = threading.Thread(target=self._listen, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.queue.put(None)
+        self.thread.join()
+        self._show(final=True)
+        return False
+
+    def state(self) -> dict:
+        '''
+        Returns the progress as a dictionary, as it is saved in path.
+        '''
+        elapsed = time.perf_counter() - self.start
+        eta = None
+        if self.rows_done > 0:
+            eta = elapsed * (self.rows_total - self.rows_done) / self.rows_done
+        return {'files_done': self.done, 'files_failed': len(self.failed),
+                'failed_files': list(self.failed), 'files_total': len(self.rows),
+                'files_remaining': len(self.rows) - self.done,
+                'samples': self.samples,
+                'samples_per_s': self.samples / elapsed if elapsed else 0.0,
+                'elapsed_s': elapsed, 'eta_s': eta,
+                'workers': {str(pid): filename
+                            for (pid, filename) in self.workers.items()}}
+
+    def _listen(self) -> None:
+        '''
+        Receives the messages until None is received.
+        '''
+        while (message := self.queue.get()) is not None:
+            (pid, event, filename, samples) = message
+            if event == 'start':
+                self.workers[pid] = filename
+            else:
+#  The main process reports files which cannot be read, it is no worker.
+                if pid in self.workers:
+                    self.workers[pid] = None
+                self.done += 1
+                self.samples += samples
+                self.rows_done += self.rows.get(filename, 0)
+                if event == 'failed':
+                    self.failed.append(filename)
+                    self._show(failed=filename)
+                    continue
+            if time.perf_counter() - self.shown >= self.interval:
+                self._show()
+
+    def _show(self, final: bool = False, failed: str = None) -> None:
+        '''
+        Updates the line and the file. A failed file is written above the
+        line, at the end all failed files are listed below it.
+        '''
+        self.shown = time.perf_counter()
+        state = self.state()
+        if state['eta_s'] is None:
+            eta = '--:--'
+        else:
+            eta = time.strftime('%M:%S', time.gmtime(state['eta_s']))
+            if state['eta_s'] >= 3600:
+                eta = f'{int(state["eta_s"] // 3600)}:{eta}'
+        busy = [os.path.basename(filename).replace('.csv', '')
+                if filename else 'idle'
+                for filename in self.workers.values()]
+        line = (f'{state["files_done"]}/{state["files_total"]} files, '
+                f'{state["files_failed"]} failed, '
+                f'{state["files_remaining"]} remaining, '
+                f'{state["samples_per_s"]:.0f} samples/s, ETA {eta} | '
+                + ' '.join(busy))
+        width = shutil.get_terminal_size().columns - 1
+        if failed is not None:
+            self.stream.write('\r' + f'{failed} has failed.'.ljust(width)
+                              + '\n')
+        self.stream.write('\r' + line[:width].ljust(width))
+        if final:
+            self.stream.write('\n')
+            if self.failed:
+                self.stream.write(f'{len(self.failed)} file(s) failed:\n')
+                self.stream.writelines(f'    {filename}\n'
+                                       for filename in self.failed)
+        self.stream.flush()
+
+        if self.path:
+            temp = self.path + '.tmp'
+            with open(temp, 'w') as file:
+                json.dump(state, file, indent=1)
+            os.replace(temp, self.path)
+
+
+def connect(queue: SimpleQueue) -> None:
+    '''
+    Initializer for the worker processes of a pool: the worker reports its
+    progress to the monitor of queue. None disconnects it.
+    '''
+    global _QUEUE
+    _QUEUE = queue
+
+
+def connected() -> bool:
+    '''
+    Tests whether this process reports its progress to a monitor.
+    '''
+    return _QUEUE is not None
+
+
+def report(event: str, filename: str, samples: int = 0) -> None:
+    '''
+    Sends a message to the monitor, if the process is connected to one.
+
+    Parameters
+    ----------
+    event : str
+        'start', 'done' or 'failed'.
+    filename : str
+        The processed file.
+    samples : int, optional
+        Number of processed samples, for done. The default is 0.
+
+    Returns
+    -------
+    None
+    '''
+    if _QUEUE is not None:
+        _QUEUE.put((os.getpid(), event, filename, samples))
+
+
+def _rows(filename: str) -> int:
+    '''
+    Estimates the rows which are read for a file.
+    '''
+    if 'AccGyr' in filename:
+        return (sched.estimate_rows(filename.replace('AccGyr', 'Gyroscope'))
+                + sched.estimate_rows(filename.replace('AccGyr',
+                                                       'Accelerometer')))
+    return sched.estimate_rows(filename)
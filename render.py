@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The render module draws the graphs in separate processes and reduces the
+series to the width of the graph before they are drawn.
+With multiprocessing, the processes which compute only put the reduced
+series into a queue. The renderer processes draw and save the graphs and
+close every figure after it is saved, so they do not collect open figures.
+A series is reduced to the minimum and the maximum of every pixel column,
+so every peak stays visible, and the cost of a graph does not grow with the
+length of the measurement.
+These are:
+    start(), stop(), connect(), connected(), submit(), decimate_index(),
+    _serve()
+"""
+
+from multiprocessing import Process, SimpleQueue
+import numpy as np
+
+# Queue of the renderer, if this process is connected to one.
+_QUEUE = None
+
+
+def start(processes: int) -> (SimpleQueue, list):
+    '''
+    Starts the renderer processes.
+
+    Parameters
+    ----------
+    processes : int
+        Number of renderer processes.
+
+    Returns
+    -------
+    queue : SimpleQueue
+        The queue for the graphs, see connect.
+    renderers : list
+        The renderer processes.
+    '''
+    queue = SimpleQueue()
+    renderers = [Process(target=_serve, args=(queue,))
+                 for _ in range(processes)]
+    for renderer in renderers:
+        renderer.start()
+    return (queue, renderers)
+
+
+def stop(queue: SimpleQueue, renderers: list) -> None:
+    '''
+    Waits until all graphs are saved and stops the renderer processes.
+    '''
+    for _ in renderers:
+        queue.put(None)
+    for renderer in renderers:
+        renderer.join()
+
+
+def connect(queue: SimpleQueue) -> None:
+    '''
+    Initializer for the worker processes of a pool: the graphs of the worker
+    are given to the renderer.
+    '''
+    global _QUEUE
+    _QUEUE = queue
+
+
+def connected() -> bool:
+    '''
+    Tests whether this process gives its graphs to a renderer.
+    '''
+    return _QUEUE is not None
+
+
+def submit(graph: str, *args) -> None:
+    '''
+    Gives a graph to the renderer.
+
+    Parameters
+    ----------
+    graph : str
+        The function of subprocessing which draws it, graph2d or graph3d.
+    *args
+        The arguments of the function.
+
+    Returns
+    -------
+    None
+    '''
+    _QUEUE.put((graph, args))
+
+
+def decimate_index(y: np.ndarray, width: int) -> np.ndarray:
+    '''
+    Selects the points of a series which are drawn. The series is divided
+    into width columns, from every column the minimum and the maximum of
+    every axis are taken in their order. The first and the last point are
+    always taken.
+
+    Parameters
+    ----------
+    y : np.ndarray
+        The series, one or more axes.
+    width : int
+        Number of pixel columns. 0 keeps all points.
+
+    Returns
+    -------
+    idx : np.ndarray
+        The sorted indices of the points to be drawn.
+    '''
+    n = len(y)
+    if width <= 0 or n <= 2*width:
+        return np.arange(n)
+
+    y = y.reshape(n, -1)
+    size = -(-n // width)
+    pad = size*width - n
+#  The last column is filled with the last point, argmin and argmax take the
+#  first of equal values, so the filling is only taken if it is the last point.
+    y_pad = np.concatenate([y, np.repeat(y[-1:], pad, axis=0)])
+    y_pad = y_pad.reshape(width, size, -1)
+    offset = (np.arange(width)*size)[:, np.newaxis]
+    idx = np.concatenate([(y_pad.argmin(axis=1) + offset).ravel(),
+                          (y_pad.argmax(axis=1) + offset).ravel(),
+                          [0, n-1]])
+    return np.unique(np.minimum(idx, n-1))
+
+
+def _serve(queue: SimpleQueue) -> None:
+    '''
+    Draws and saves the graphs of the queue until None is received. A graph
+    which fails is reported and the next one is drawn, so the renderer does
+    not stop while the workers still put graphs into the queue.
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+    import subprocessing as sub
+
+    sub.ignore_interrupt()
+    while (job := queue.get()) is not None:
+        (graph, args) = job
+        try:
+            getattr(sub, graph)(*args)
+        except Exception as error:
+            filename = next((arg for arg in args if isinstance(arg, str)
+                             and arg.endswith('.csv')), '')
+            print(f'The {graph} of {filename} could not be saved: {error!r}')
+        finally:
+            plt.close('all')
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The scheduler module distributes the jobs over the worker processes so that
+the estimated memory of all running jobs stays within a given budget.
+These are:
+    budgeted_starmap(), estimate_memory(), estimate_rows()
+"""
+
+import os
+import threading
+
+# Estimated peak bytes per row of a file, needed by np.loadtxt while parsing
+# and by the arrays of the pipeline stages.
+_PARSE_BYTES = 80
+_STAGE_BYTES = {'Accelerometer': 200, 'Gyroscope': 150, 'AccGyr': 450}
+_TRAJECTORY_BYTES = 24
+_SAMPLE_SIZE = 65536
+
+
+def estimate_rows(filename: str) -> int:
+    '''
+    Estimates the number of rows of a .csv file from its size and the mean
+    line length of the beginning of the file. So the file has not to be read
+    completely.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file.
+
+    Returns
+    -------
+    rows : int
+        Estimated number of rows. 0 if the file does not exist.
+    '''
+    try:
+        size = os.path.getsize(filename)
+        with open(filename, 'rb') as file:
+            sample = file.read(_SAMPLE_SIZE)
+    except OSError:
+        return 0
+
+    lines = sample.count(b'\n')
+    if lines == 0:
+        return 1
+
+    return int(size / (len(sample) / lines))
+
+
+def estimate_memory(filename: str, acc_dict: dict) -> float:
+    '''
+    Estimates the peak memory of the processing of a file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file being processed.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+
+    Returns
+    -------
+    memory : float
+        Estimated peak memory in MB.
+    '''
+    if 'AccGyr' in filename:
+        kind = 'AccGyr'
+        rows = (estimate_rows(filename.replace('AccGyr', 'Accelerometer'))
+                + estimate_rows(filename.replace('AccGyr', 'Gyroscope')))
+    elif 'Accelerometer' in filename:
+        kind = 'Accelerometer'
+        rows = estimate_rows(filename)
+    elif 'Gyroscope' in filename:
+        kind = 'Gyroscope'
+        rows = estimate_rows(filename)
+    else:
+        return 0.0
+
+    bytes_per_row = _PARSE_BYTES + _STAGE_BYTES[kind]
+    if kind != 'Gyroscope' and acc_dict['trajectory']:
+        bytes_per_row += _TRAJECTORY_BYTES
+
+    return rows * bytes_per_row / 1e6
+
+
+def budgeted_starmap(pool, func, iterable: list, footprints: list,
+                     budget: float, processes: int) -> list:
+    '''
+    Like Pool.starmap, but a job is only started if the estimated memory of
+    all running jobs including the new one fits into the budget. The other
+    jobs are queued. Queued jobs which fit into the remaining budget are
+    started first, so small files can fill the gaps of large files. A job
+    which is larger than the whole budget is started alone.
+
+    Parameters
+    ----------
+    pool : multiprocessing.Pool
+        The pool which processes the jobs.
+    func : callable
+        The function to be applied.
+    iterable : list
+        The arguments for func, one tuple per job.
+    footprints : list
+        The estimated memory of each job in MB.
+    budget : float
+        The memory budget in MB.
+    processes : int
+        Number of the processes of the pool.
+
+    Returns
+    -------
+    results : list
+        The results in the order of iterable.
+    '''
+    queue = list(range(len(iterable)))
+    running = {}
+    results = [None] * len(iterable)
+    done = []
+    errors = []
+    in_use = 0.0
+    finished = threading.Event()
+
+    def make_callback(idx):
+        def callback(result):
+            results[idx] = result
+            done.append(idx)
+            finished.set()
+        return callback
+
+    def error_callback(error):
+        errors.append(error)
+        finished.set()
+
+    while queue or running:
+        for idx in list(queue):
+            if len(running) >= processes:
+                break
+            need = footprints[idx]
+            if in_use + need <= budget or not running:
+                if need > budget:
+                    print(f'{iterable[idx][0]} needs about {need:.0f}MB, more\
+ than the memory budget of {budget:.0f}MB. It is processed alone.')
+                running[idx] = pool.apply_async(
+                    func, iterable[idx], callback=make_callback(idx),
+                    error_callback=error_callback)
+                in_use += need
+                queue.remove(idx)
+
+        finished.wait()
+        finished.clear()
+        if errors:
+            raise errors[0]
+
+        while done:
+            idx = done.pop()
+            del running[idx]
+            in_use -= footprints[idx]
+
+    return results
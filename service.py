@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The service module keeps a pool of worker processes running, in which NumPy,
+SciPy and matplotlib are already imported. main.py sends its jobs over a
+Unix socket to the service and gets the results back as soon as they are
+ready, so the start of the workers is only paid once.
+The service is started with python service.py and stopped with Ctrl+C. It
+uses the socket given by service_socket in [MAIN]. Only the user who has
+started the service can use the socket.
+These are:
+    serve(), submit(), available(), _handle(), _run_job(), _warm_up()
+"""
+
+import os
+import threading
+import queue
+from multiprocessing import Pool
+from multiprocessing.connection import Listener, Client
+
+from config_parser import get_config
+
+
+def serve(main_dict: dict) -> None:
+    '''
+    Starts the service and answers the requests until Ctrl+C is pressed.
+
+    Parameters
+    ----------
+    main_dict : dict
+        The dictionary which stores all constants for main.
+
+    Returns
+    -------
+    None
+    '''
+    address = main_dict['service_socket']
+    if os.path.exists(address):
+        os.remove(address)
+
+    umask = os.umask(0o177)
+    try:
+        listener = Listener(address, family='AF_UNIX')
+    finally:
+        os.umask(umask)
+
+    workers = main_dict['max_processes']
+    with Pool(processes=workers, initializer=_warm_up) as pool:
+        print(f'The service is running with {workers} processes on {address}.')
+        try:
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=_handle, args=(conn, pool),
+                                 daemon=True).start()
+        except KeyboardInterrupt:
+            print('\nThe service is stopped.')
+        finally:
+            listener.close()
+
+
+def submit(jobs: list, address: str):
+    '''
+    Sends the jobs to the service and yields the results in the order in
+    which they are finished. A job which has failed in the service gives
+    (filename, None, None, None, None) like a file which cannot be analyzed.
+
+    Parameters
+    ----------
+    jobs : list
+        The arguments of processing.main, one tuple per job.
+    address : str
+        The socket of the service.
+
+    Raise
+    -----
+    ConnectionError
+        If the service is not running or stops before all results are sent.
+
+    Yields
+    ------
+    idx : int
+        The position of the job in jobs.
+    data : tuple
+        The result of processing.main.
+    '''
+    try:
+        conn = Client(address, family='AF_UNIX')
+    except OSError as error:
+        raise ConnectionError(f'The service on {address} is not running.')\
+            from error
+
+    with conn:
+        try:
+            conn.send(('run', os.getcwd(), [tuple(job) for job in jobs]))
+            for _ in range(len(jobs)):
+                (status, idx, data) = conn.recv()
+                if status == 'error':
+                    print(f'{jobs[idx][0]} has failed in the service: {data}')
+                    data = (jobs[idx][0], None, None, None, None)
+                yield (idx, data)
+        except (EOFError, OSError) as error:
+            raise ConnectionError(f'The service on {address} has stopped.')\
+                from error
+
+
+def available(address: str) -> bool:
+    '''
+    Tests whether the socket of a service exists.
+    '''
+    return os.path.exists(address)
+
+
+def _handle(conn, pool) -> None:
+    '''
+    Answers the requests of one client. Every result is sent as soon as it is
+    ready.
+    '''
+    results = queue.Queue()
+    with conn:
+        try:
+            (_, cwd, jobs) = conn.recv()
+        except EOFError:
+            return
+
+        for (idx, job) in enumerate(jobs):
+            pool.apply_async(
+                _run_job, (cwd,) + tuple(job),
+                callback=lambda data, idx=idx: results.put(('result', idx,
+                                                            data)),
+                error_callback=lambda error, idx=idx: results.put(
+                    ('error', idx, repr(error))))
+
+        try:
+            for _ in jobs:
+                conn.send(results.get())
+        except (BrokenPipeError, ConnectionResetError):
+            print('A client has closed the connection.')
+
+
+def _run_job(cwd: str, filename: str, acc_dict: dict, gyr_dict: dict,
+             graph_dict: dict) -> tuple:
+    '''
+    Runs processing.main in the folder of the client. Graphs are only saved,
+    not shown.
+    '''
+    import processing as proces
+
+    os.chdir(cwd)
+    graph_dict = dict(graph_dict)
+    if graph_dict['do_graph']:
+        graph_dict['save_graph'] = True
+        os.makedirs('saved_graphs', exist_ok=True)
+
+    return proces.main(filename, acc_dict, gyr_dict, graph_dict)
+
+
+def _warm_up() -> None:
+    '''
+    Initializer for the workers: imports SciPy and matplotlib, which are
+    otherwise only imported at the first job which needs them.
+    '''
+    import subprocessing as sub
+
+    sub.ignore_interrupt()
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    import scipy.interpolate  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
+
+
+if __name__ == '__main__':
+    print('Service starts...\n')
+    serve(get_config(filename='config.ini')[0])
@@ -8,18 +8,22 @@ Version: v0.4-beta
 The Subprocessing module contains all functions responsible for the
 subprocessing of data.
 These are:
-    read(), sumforline(), grap2d(), graph3d(), synchronize()
+    read(), time_index(), build_index(), sumforline(), grap2d(), graph3d(),
+    synchronize(), ignore_interrupt(), _read_window(), _parse()
 """
 
+import os
+import signal
+from multiprocessing import current_process
 import numpy as np
-from matplotlib import pyplot as plt
-from matplotlib.ticker import FormatStrFormatter
 
 import conversions as conv
+import render
 
 
-def read(filename: str, delimiter: str = ',', skip_header: int = 1) -> (
-        np.ndarray, np.ndarray):
+def read(filename: str, delimiter: str = ',', skip_header: int = 1,
+         dtype=np.float64, t_start: float = None, t_end: float = None,
+         stride: int = 1000) -> (np.ndarray, np.ndarray):
     """
     Reads a .csv file. The first line is skipped. The delimiter ist ','.
 
@@ -32,6 +36,18 @@ def read(filename: str, delimiter: str = ',', skip_header: int = 1) -> (
         from each other. The default is ','.
     skip_header : int, optional
         How many lines to skip at the beginning. The default is 1.
+    dtype : np.dtype, optional
+        Type of the measured values, the time is always float64. The values
+        are parsed directly into this type. The default is np.float64.
+    t_start : float, optional
+        Only the samples with elapsed (s) >= t_start are read. The default is
+        None, from the beginning.
+    t_end : float, optional
+        Only the samples with elapsed (s) <= t_end are read. The default is
+        None, to the end.
+    stride : int, optional
+        Lines between two entries of the index, if it has to be built for
+        t_start or t_end. The default is 1000.
 
     Returns
     -------
@@ -44,30 +60,177 @@ def read(filename: str, delimiter: str = ',', skip_header: int = 1) -> (
     Since it can happen that two measured values of the time have the same
     value, therefore one of the time points is deleted here. In the vector, an
     average is formed for these two points.
+    With t_start or t_end only the lines of the window are parsed, they are
+    found with the index of time_index. The result is the same as the part
+    of the whole file in the window.
     """
-    data = np.genfromtxt(filename, delimiter=delimiter,
-                         skip_header=skip_header)
-    t = data[:, 2]
-    vec = data[:, 3:]
-    ts = len(t)
-    eq_n = np.array([], dtype=int)
-    for n in range(ts-1):
-        if t[n] == t[n+1]:
-            eq_n = np.append(eq_n, n)
-
-    if vec.ndim != 1:
-        for n in eq_n:
-            vec[n, :] = (vec[n, :] + vec[n+1, :]) / 2
-
+    if t_start is None and t_end is None:
+        (t, vec) = _parse(filename, delimiter, skip_header, dtype)
     else:
-        for n in eq_n:
-            vec[n] = (vec[n] + vec[n+1]) / 2
+        (t, vec) = _read_window(filename, delimiter, skip_header, t_start,
+                                t_end, stride, dtype)
+#  Every point n is only changed after it has been used for n-1, so all
+#  points can be averaged at once.
+    eq_n = np.flatnonzero(t[:-1] == t[1:])
+    vec[eq_n] += vec[eq_n+1]
+    vec[eq_n] /= 2
 
     t = np.delete(t, eq_n+1)
     vec = np.delete(vec, eq_n+1, axis=0)
     return (t, vec)
 
 
+def _parse(filename: str, delimiter: str, skip_header: int, dtype,
+           lines: list = None) -> (np.ndarray, np.ndarray):
+    """
+    Parses the columns from elapsed (s) on with np.loadtxt: the time as
+    float64 and the measured values directly as dtype, so no float64 copy of
+    the values is made. The number of columns is taken from the first line
+    of the data. If lines is given, they are parsed instead of the file.
+    """
+    if lines is None:
+        with open(filename) as file:
+            for _ in range(skip_header):
+                file.readline()
+            first = file.readline()
+        source = filename
+    else:
+        (first, source, skip_header) = (lines[0] if lines else '', lines, 0)
+    columns = first.count(delimiter) + 1
+    if not first.strip():
+        raise ValueError(f'{filename} has no samples.')
+    if columns < 4:
+        raise ValueError(f'{filename} has only {columns} columns.')
+    row = np.dtype([('t', np.float64), ('vec', dtype, (columns-3,))])
+    data = np.loadtxt(source, delimiter=delimiter, skiprows=skip_header,
+                      usecols=range(2, columns), dtype=row, ndmin=1)
+    return (data['t'], data['vec'])
+
+
+def time_index(filename: str, delimiter: str = ',', skip_header: int = 1,
+               stride: int = 1000) -> (np.ndarray, np.ndarray):
+    """
+    Returns the index of a .csv file: the elapsed (s) of every stride-th line
+    and the byte offset where the line starts. The index is stored next to
+    the file as filename.idx and is built again if the size or the time of
+    modification of the file, the stride, the delimiter or skip_header has
+    changed.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the indexed file.
+    delimiter : str, optional
+        The delimiter of the file. The default is ','.
+    skip_header : int, optional
+        How many lines to skip at the beginning. The default is 1.
+    stride : int, optional
+        Lines between two entries, if the index is built. The default is 1000.
+
+    Returns
+    -------
+    t_index : np.ndarray
+        elapsed (s) of the entries.
+    offset : np.ndarray
+        Byte offset of the entries. The last one is the size of the file.
+    """
+    stat = os.stat(filename)
+    try:
+        with np.load(filename + '.idx') as stored:
+            if (int(stored['size']) == stat.st_size
+                    and int(stored['mtime']) == stat.st_mtime_ns
+                    and int(stored['stride']) == max(int(stride), 1)
+                    and str(stored['delimiter']) == delimiter
+                    and int(stored['skip_header']) == skip_header):
+                return (stored['t'], stored['offset'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return build_index(filename, delimiter, skip_header, stride)
+
+
+def build_index(filename: str, delimiter: str = ',', skip_header: int = 1,
+                stride: int = 1000) -> (np.ndarray, np.ndarray):
+    """
+    Builds the index of time_index and stores it as filename.idx. The file is
+    only searched for line breaks, elapsed (s) is parsed for every stride-th
+    line. If the index cannot be stored, it is only returned.
+
+    Returns
+    -------
+    t_index : np.ndarray
+        elapsed (s) of the entries.
+    offset : np.ndarray
+        Byte offset of the entries. The last one is the size of the file.
+    """
+    stat = os.stat(filename)
+    stride = max(int(stride), 1)
+    starts = []
+    with open(filename, 'rb') as file:
+        for _ in range(skip_header):
+            file.readline()
+        position = file.tell()
+        starts.append(position)
+        lines = 0
+        while chunk := file.read(2**24):
+#  Line k+1 starts after the k-th line break of the data.
+            breaks = np.flatnonzero(np.frombuffer(chunk, np.uint8) == 10)
+            number = lines + np.arange(1, breaks.size+1)
+            starts.extend((breaks[number % stride == 0] + position + 1)
+                          .tolist())
+            lines += breaks.size
+            position += len(chunk)
+
+        t_index = []
+        offset = []
+        for start in starts:
+            file.seek(start)
+            fields = file.readline().split(delimiter.encode())
+            if len(fields) > 2 and fields[2].strip():
+                t_index.append(float(fields[2]))
+                offset.append(start)
+    offset.append(stat.st_size)
+    t_index.append(np.inf)
+    (t_index, offset) = (np.array(t_index), np.array(offset, dtype=np.int64))
+
+    temp = f'{filename}.idx.{os.getpid()}'
+    try:
+        with open(temp, 'wb') as file:
+            np.savez(file, t=t_index, offset=offset, size=stat.st_size,
+                     mtime=stat.st_mtime_ns, stride=stride,
+                     delimiter=delimiter, skip_header=skip_header)
+        os.replace(temp, filename + '.idx')
+    except OSError:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return (t_index, offset)
+
+
+def _read_window(filename: str, delimiter: str, skip_header: int,
+                 t_start: float, t_end: float, stride: int,
+                 dtype=np.float64) -> (np.ndarray, np.ndarray):
+    """
+    Parses only the lines of the index entries around the window.
+    """
+    (t_index, offset) = time_index(filename, delimiter, skip_header, stride)
+    t_start = -np.inf if t_start is None else t_start
+    t_end = np.inf if t_end is None else t_end
+#  Starts at the last entry before t_start, so equal times at t_start are
+#  all read, and ends at the first entry after t_end.
+    first = max(np.searchsorted(t_index, t_start, side='left') - 1, 0)
+    last = min(np.searchsorted(t_index, t_end, side='right'), offset.size-1)
+    with open(filename, 'rb') as file:
+        file.seek(offset[first])
+        lines = file.read(offset[last] - offset[first]).decode().splitlines()
+
+    (t, vec) = _parse(filename, delimiter, skip_header, dtype, lines)
+    inside = (t >= t_start) & (t <= t_end)
+    if not inside.any():
+        raise ValueError(f'{filename} has no samples between {t_start}s and\
+ {t_end}s.')
+    return (t[inside], vec[inside])
+
+
 def sumforline(filename: str, sub: int = 0) -> int:
     """
     Counts the lines in a .csv file.
@@ -119,6 +282,16 @@ def graph2d(t: np.ndarray, y: np.ndarray, typ: str, graph_dict: dict,
     -------
     None.
     """
+    idx = render.decimate_index(y, graph_dict['pixel_width'])
+    (t, y) = (t[idx], y[idx])
+    if graph_dict['save_graph'] and render.connected():
+        render.submit('graph2d', t, y, typ, dict(graph_dict), filename,
+                      string_check)
+        return
+
+    from matplotlib import pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+
     _stringf = FormatStrFormatter(graph_dict['formatter'])
     fig = plt.figure()
     ax = fig.add_subplot()
@@ -152,6 +325,9 @@ def graph2d(t: np.ndarray, y: np.ndarray, typ: str, graph_dict: dict,
         fname = 'saved_graphs/' + filename + '.png'
         fname = fname.replace('input/', '').replace('.csv', '')
         fig.savefig(fname)
+#  A worker of a pool can not show the figure, so it is closed.
+        if current_process().daemon:
+            plt.close(fig)
 
 
 def graph3d(xyz: np.ndarray, graph_dict: dict, string_check: str,
@@ -174,6 +350,15 @@ def graph3d(xyz: np.ndarray, graph_dict: dict, string_check: str,
     -------
     None.
     """
+    xyz = xyz[render.decimate_index(xyz, graph_dict['pixel_width'])]
+    if graph_dict['save_graph'] and render.connected():
+        render.submit('graph3d', xyz, dict(graph_dict), string_check,
+                      filename)
+        return
+
+    from matplotlib import pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+
     _stringf = FormatStrFormatter(graph_dict['formatter'])
     fig = plt.figure()
     ax = plt.axes(projection='3d')
@@ -197,10 +382,13 @@ def graph3d(xyz: np.ndarray, graph_dict: dict, string_check: str,
         fname = conv.string('saved_graphs/', filename, string_check) + '_3d.png'
         fname = fname.replace(',', '')
         fig.savefig(fname)
+        if current_process().daemon:
+            plt.close(fig)
 
 
 def synchronize(t_1: np.ndarray, vec_1: np.ndarray, t_2: np.ndarray,
-                vec_2: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+                vec_2: np.ndarray, threads: int = 1) -> (np.ndarray, np.ndarray,
+                                                         np.ndarray):
     """
     Synronizes two measurement series so that they have measurement points at
     the same time. The required measurement points are intrapolated.
@@ -215,6 +403,9 @@ def synchronize(t_1: np.ndarray, vec_1: np.ndarray, t_2: np.ndarray,
         Time of the second measurement series.
     vec_2 : np.ndarray
         Measurement data from t_2.
+    threads : int, optional
+        How many threads interpolate the axes at the same time. The default
+        is 1.
 
     Returns
     -------
@@ -228,16 +419,20 @@ def synchronize(t_1: np.ndarray, vec_1: np.ndarray, t_2: np.ndarray,
     (vec_1_x, vec_1_y) = vec_1.shape
     (vec_2_x, vec_2_y) = vec_2.shape
     if vec_1_x <= vec_2_x:
-        vec_temp = np.zeros((vec_1_x, vec_1_y))
-        for n in range(0, vec_1_y):
+        vec_temp = conv.allocate((vec_1_x, vec_1_y), vec_2.dtype)
+
+        def axis(n):
             vec_temp[:, n] = np.interp(t_1, t_2, vec_2[:, n])
+        conv.map_axes(axis, vec_1_y, threads)
         t = t_1
         vec_2 = vec_temp
 
     else:
-        vec_temp = np.zeros((vec_2_x, vec_2_y))
-        for n in range(0, vec_2_y):
+        vec_temp = conv.allocate((vec_2_x, vec_2_y), vec_1.dtype)
+
+        def axis(n):
             vec_temp[:, n] = np.interp(t_2, t_1, vec_1[:, n])
+        conv.map_axes(axis, vec_2_y, threads)
         t = t_2
         vec_1 = vec_temp
 
@@ -289,6 +484,18 @@ def input_test(question: str, n: int = 0, n_max: int = 2) -> bool:
     return res
 
 
+def ignore_interrupt() -> None:
+    '''
+    Initializer for the worker processes of a pool: Ctrl+C only stops the
+    main process and the workers finish their jobs.
+
+    Returns
+    -------
+    None
+    '''
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
 def filename_sorting_key(filename: str) -> int:
     '''
     Returns a value for the given file name by which it can be sorted.
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The sweep module evaluates a grid of config values for the same files. Every
+file is read and synchronized only once. The results of the stages are
+stored with the values they depend on, so unchanged stages are reused.
+The grid is given in the [SWEEP] section of the config file, e.g.
+    acc_error = 0.001, 0.002
+    gyr_integration_mode = a, s
+These are:
+    sweep(), grid(), save_table(), _init(), _evaluate(), _stage(), _summary(),
+    _changed()
+"""
+
+import os
+import time
+import itertools
+from functools import partial
+import json
+from datetime import datetime
+from multiprocessing import Pool
+import numpy as np
+
+import processing as proces
+import cache
+from config_parser import get_config, get_sweep, str_gen
+
+# Memory of the stage results of a worker.
+_STAGES = {}
+_MAX_STAGES = 8
+_LOADED = {}
+_ENERGIES = ['E_trans', 'E_rot', 'E_kin']
+
+
+def sweep(filenames: list, acc_dict: dict, gyr_dict: dict, sweep_dict: dict,
+          processes: int = 1) -> list:
+    '''
+    Evaluates all combinations of the sweep values for all files.
+
+    Parameters
+    ----------
+    filenames : list
+        The files to be evaluated.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    sweep_dict : dict
+        The values to be tested, see config_parser.get_sweep.
+    processes : int, optional
+        Number of processes. The default is 1.
+
+    Returns
+    -------
+    rows : list
+        One tuple (filename, values, summary) per combination.
+    '''
+    loaded = {}
+    for filename in filenames:
+        data = proces.load(filename, acc_dict['threads'], acc_dict['compact'],
+                           **proces.window(acc_dict))
+        if data is not None:
+            loaded[filename] = data
+
+    tasks = []
+    for filename in loaded:
+        acc_grid = grid(acc_dict, sweep_dict['ACCELEROMETER'])
+        gyr_grid = grid(gyr_dict, sweep_dict['GYROSCOPE'])
+        if 'AccGyr' not in filename:
+            if 'Accelerometer' in filename:
+                gyr_grid = [None]
+            else:
+                acc_grid = [None]
+        for (gyr_now, acc_now) in itertools.product(gyr_grid, acc_grid):
+            tasks.append((filename, acc_now, gyr_now))
+
+    print(f'{len(loaded)} file(s) with {len(tasks)} combination(s) are\
+ evaluated.')
+    chunksize = max(len(tasks) // (4*processes), 1)
+    if processes > 1:
+        with Pool(processes, initializer=_init, initargs=(loaded,)) as pool:
+            summaries = pool.starmap(_evaluate, tasks, chunksize=chunksize)
+    else:
+        _init(loaded)
+        summaries = [_evaluate(*task) for task in tasks]
+
+    return [(filename, _changed(acc_now, gyr_now, sweep_dict), summary)
+            for ((filename, acc_now, gyr_now), summary)
+            in zip(tasks, summaries)]
+
+
+def grid(sensor_dict: dict, values: dict) -> list:
+    '''
+    Creates a dictionary for every combination of the values.
+
+    Parameters
+    ----------
+    sensor_dict : dict
+        The dictionary of the sensor with the values which are not changed.
+    values : dict
+        The values of every key to be tested.
+
+    Returns
+    -------
+    res : list
+        The dictionaries of all combinations.
+    '''
+    res = []
+    keys = list(values)
+    for combination in itertools.product(*[values[key] for key in keys]):
+        sensor_now = dict(sensor_dict)
+        sensor_now.update(zip(keys, combination))
+        res.append(sensor_now)
+
+    return res
+
+
+def save_table(rows: list, sweep_dict: dict, directory: str = 'output') -> str:
+    '''
+    Saves the comparison of all combinations as .csv file.
+
+    Parameters
+    ----------
+    rows : list
+        The result of sweep.
+    sweep_dict : dict
+        The values which have been tested.
+    directory : str, optional
+        Where the table is saved. The default is 'output'.
+
+    Returns
+    -------
+    _path : str
+        The name of the saved file.
+    '''
+    os.makedirs(directory, exist_ok=True)
+    to_day = str(datetime.now())[:19].replace('-', '_').replace(
+        ' ', '-').replace(':', '_')
+    _path = os.path.join(directory, f'sweep_{to_day}.csv')
+    columns = ([f'acc_{key}' for key in sweep_dict['ACCELEROMETER']]
+               + [f'gyr_{key}' for key in sweep_dict['GYROSCOPE']])
+    header = ['filename'] + columns + [
+        f'{energy} {stat} in J' for energy in _ENERGIES
+        for stat in ['mean', 'max']]
+    with open(_path, 'w') as file:
+        file.write(', '.join(header) + '\n')
+        for (filename, values, summary) in rows:
+            line = [filename] + [str(values.get(key, '')) for key in columns]
+            line += [f'{value:1.5e}' for value in summary]
+            file.write(', '.join(line) + '\n')
+
+    print(f'{_path} saved.')
+    return _path
+
+
+def _init(loaded: dict) -> None:
+    '''
+    Gives the read files to a worker.
+    '''
+    _LOADED.clear()
+    _LOADED.update(loaded)
+    _STAGES.clear()
+
+
+def _evaluate(filename: str, acc_dict: dict, gyr_dict: dict) -> tuple:
+    '''
+    Calculates the energies of one combination with processing.energies,
+    the stages are reused by _stage. If a stage fails, nan is given.
+    '''
+    dtype = proces.compute_dtype(gyr_dict if acc_dict is None else acc_dict)
+    loaded = proces.expand(_LOADED[filename], dtype)
+    try:
+        (data, _) = proces.energies(filename, loaded, acc_dict, gyr_dict,
+                                    stage=partial(_stage, filename))
+    except (RuntimeWarning, ValueError, TypeError) as error:
+        print(f'{filename}: {error}')
+        data = (filename, None, None, None, None)
+
+    return _summary(*data[2:])
+
+
+def _stage(filename: str, name: str, depends: object, fun, *args, **kwargs):
+    '''
+    Returns the stored result of a stage or calculates it. The result is
+    stored with the name of the stage, the file and the config values in
+    depends.
+    '''
+    if not isinstance(depends, list):
+        depends = [depends]
+    key = json.dumps([name, filename] + [cache._normalize(sensor_dict)
+                                         for sensor_dict in depends],
+                     sort_keys=True)
+    if key not in _STAGES:
+        if len(_STAGES) >= _MAX_STAGES:
+            del _STAGES[next(iter(_STAGES))]
+        _STAGES[key] = fun(*args, **kwargs)
+
+    return _STAGES[key]
+
+
+def _summary(*energies) -> tuple:
+    '''
+    Mean and maximum of every energy, nan if it has not been calculated.
+    '''
+    res = []
+    for energy in energies:
+        if energy is None:
+            res += [np.nan, np.nan]
+        else:
+            res += [energy.mean(), energy.max()]
+
+    return tuple(res)
+
+
+def _changed(acc_dict: dict, gyr_dict: dict, sweep_dict: dict) -> dict:
+    '''
+    The tested values of a combination, with the prefix of the sensor.
+    '''
+    res = {}
+    if acc_dict is not None:
+        res.update({f'acc_{key}': acc_dict[key]
+                    for key in sweep_dict['ACCELEROMETER']})
+    if gyr_dict is not None:
+        res.update({f'gyr_{key}': gyr_dict[key]
+                    for key in sweep_dict['GYROSCOPE']})
+    return res
+
+
+if __name__ == '__main__':
+    print('Sweep starts...\n')
+    time_start = time.perf_counter()
+    (main_dict, acc_dict,
+     gyr_dict, _) = get_config(filename='config.ini')
+    sweep_dict = get_sweep(acc_dict, gyr_dict, filename='config.ini')
+    if main_dict['filenames_auto']:
+        filenames = str_gen(main_dict['names'], main_dict['measurements'])
+    else:
+        filenames = main_dict['filenames']
+
+    rows = sweep(filenames, acc_dict, gyr_dict, sweep_dict,
+                 processes=main_dict['max_processes'])
+    save_table(rows, sweep_dict)
+    print(f'\nIt took {round(time.perf_counter() - time_start, 3)}s to run\
+ the sweep.')
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The watch module watches the input folder and processes new recordings as
+soon as they are completely written. The files of a sensor are paired by the
+name of the sensor, the measurements from the config file decide which jobs
+are created. The jobs are given to a pool of processes which is started only
+once. It is started with python watch.py and stopped with Ctrl+C.
+If the package inotify_simple is installed, the folder is watched with
+inotify, else it is checked every watch_interval seconds.
+The time index of a new file is built before its job is started, so reads
+of a time window do not have to search the file, see sub.time_index.
+These are:
+    watch(), scan(), pending_jobs(), _wait()
+"""
+
+import os
+import time
+from multiprocessing import Pool
+
+import processing as proces
+import subprocessing as sub
+import cache
+from config_parser import get_config
+from data_output import data_storer, config_metadata
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+_SENSORS = ['Accelerometer', 'Gyroscope']
+
+
+def watch(main_dict: dict, acc_dict: dict, gyr_dict: dict,
+          graph_dict: dict) -> None:
+    '''
+    Watches the folder main_dict['watch_dir'] until Ctrl+C is pressed.
+
+    Parameters
+    ----------
+    main_dict : dict
+        The dictionary which stores all constants for main.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+
+    Returns
+    -------
+    None
+    '''
+    directory = main_dict['watch_dir']
+    interval = main_dict['watch_interval']
+    os.makedirs(directory, exist_ok=True)
+    if graph_dict['do_graph']:
+        graph_dict['save_graph'] = True
+        os.makedirs('saved_graphs', exist_ok=True)
+
+    if INotify is not None:
+        notify = INotify()
+        notify.add_watch(directory, flags.CLOSE_WRITE | flags.MOVED_TO)
+        print(f'{directory} is watched with inotify.')
+    else:
+        notify = None
+        print(f'{directory} is checked every {interval}s.')
+
+    seen = {}
+    dispatched = {}
+
+    def store(data):
+        if data[1] is None:
+            return
+        if main_dict['save_output']:
+            data_storer([data], main_dict['save_formatter'],
+                        main_dict['save_format'],
+                        config_metadata(acc_dict, gyr_dict))
+
+    with Pool(processes=main_dict['max_processes'],
+              initializer=sub.ignore_interrupt) as pool:
+        try:
+            while True:
+                written = _wait(notify, interval)
+                complete = scan(directory, seen, written)
+                for (job, signature) in pending_jobs(
+                        complete, main_dict['measurements'], directory,
+                        dispatched):
+                    dispatched[job] = signature
+                    for filename in cache.input_files(job):
+                        sub.time_index(filename,
+                                       stride=main_dict['index_stride'])
+                    print(f'{job} is processed.')
+                    pool.apply_async(proces.main,
+                                     (job, acc_dict, gyr_dict, graph_dict),
+                                     callback=store,
+                                     error_callback=print)
+        except KeyboardInterrupt:
+            print('\nThe running jobs are finished.')
+            pool.close()
+            pool.join()
+
+
+def scan(directory: str, seen: dict, written: set = None) -> dict:
+    '''
+    Searches the sensor files in directory which are completely written.
+    A file is complete if inotify has reported that it has been closed or
+    if its size and time of modification have not changed since the last
+    scan.
+
+    Parameters
+    ----------
+    directory : str
+        The folder to be watched.
+    seen : dict
+        Size and time of modification of every file at the last scan. It is
+        updated.
+    written : set, optional
+        Names of the files inotify has reported as closed.
+
+    Returns
+    -------
+    complete : dict
+        Size and time of modification of the complete files.
+    '''
+    complete = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith(tuple(f'_{sensor}.csv'
+                                             for sensor in _SENSORS)):
+                continue
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if seen.get(entry.name) == signature or (
+                    written and entry.name in written):
+                complete[entry.name] = signature
+            seen[entry.name] = signature
+
+    return complete
+
+
+def pending_jobs(complete: dict, measurements: list, directory: str,
+                 dispatched: dict) -> list:
+    '''
+    Creates the jobs for the complete files which have not been processed
+    in this version. An AccGyr job needs both files of the sensor.
+
+    Parameters
+    ----------
+    complete : dict
+        The complete files, see scan.
+    measurements : list
+        Which measurements should be evaluated.
+    directory : str
+        The folder of the files.
+    dispatched : dict
+        The jobs which have already been started.
+
+    Returns
+    -------
+    jobs : list
+        Tuples of the name of the job and the versions of its files.
+    '''
+    names = {filename.rsplit('_', 1)[0] for filename in complete}
+    jobs = []
+    for name in sorted(names):
+        for measured in measurements:
+            if measured == 'AccGyr':
+                needed = [f'{name}_{sensor}.csv' for sensor in _SENSORS]
+            else:
+                needed = [f'{name}_{measured}.csv']
+            if not all(filename in complete for filename in needed):
+                continue
+
+            job = os.path.join(directory, f'{name}_{measured}.csv')
+            signature = tuple(complete[filename] for filename in needed)
+            if dispatched.get(job) != signature:
+                jobs.append((job, signature))
+
+    return jobs
+
+
+def _wait(notify, interval: float) -> set:
+    '''
+    Waits for the next scan and gives the files inotify has reported.
+    '''
+    if notify is None:
+        time.sleep(interval)
+        return set()
+
+    return {event.name for event in notify.read(timeout=int(interval*1000))}
+
+
+if __name__ == '__main__':
+    print('Watch starts...\n')
+    watch(*get_config(filename='config.ini'))
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+@author: SmartDust
+Version: v0.5-beta
+
+The workqueue module distributes the jobs over several machines. The
+coordinator puts the jobs into a spool directory on a shared filesystem,
+the workers take them from there and put back the results. All steps are
+done by renaming files, which is atomic on one filesystem.
+    spool/pending/<job>.job             jobs which are waiting
+    spool/running/<worker>/<job>.job    jobs a worker has taken
+    spool/done/<job>.result             results
+    spool/failed/<job>.error            jobs which have failed too often
+    spool/workers/<worker>.heartbeat    counter which a worker increases
+If the heartbeat of a worker does not change for heartbeat_timeout seconds,
+the coordinator gives its jobs to the other workers. A failed job is tried
+again up to max_retries times. The time of the coordinator is used for the
+heartbeats, so the clocks of the machines do not have to be synchronous.
+The workers have to be started in the same project folder as the
+coordinator, the file names are relative to it.
+Usage:
+    python workqueue.py coordinator
+    python workqueue.py worker [--exit-when-idle]
+These are:
+    coordinator(), worker(), publish(), collect(), requeue_lost(), claim(),
+    finish(), _retry(), _run_job(), _write(), _read(), _heartbeat(), _dirs()
+"""
+
+import os
+import sys
+import time
+import socket
+import pickle
+import argparse
+import threading
+from multiprocessing import Pool
+
+import processing as proces
+import subprocessing as sub
+from config_parser import get_config, str_gen
+from data_output import data_storer, config_metadata
+
+
+def coordinator(filenames: list, main_dict: dict, acc_dict: dict,
+                gyr_dict: dict, graph_dict: dict) -> list:
+    '''
+    Publishes the jobs and waits until every job has a result or has failed.
+
+    Parameters
+    ----------
+    filenames : list
+        The files to be processed.
+    main_dict : dict
+        The dictionary which stores all constants for main.
+    acc_dict : dict
+        The dictionary which stores all constants for the accelerometer.
+    gyr_dict : dict
+        The dictionary which stores all constants for the gyroscope.
+    graph_dict : dict
+        The dictionary which stores all constants for the graph.
+
+    Returns
+    -------
+    data : list
+        The results of processing.main in the order of filenames. Failed
+        jobs give (filename, None, None, None, None).
+    '''
+    spool = main_dict['spool_dir']
+    job_ids = publish(spool, filenames, acc_dict, gyr_dict, graph_dict)
+    print(f'{len(job_ids)} job(s) have been published in {spool}.')
+    results = {}
+    seen = {}
+    while len(results) < len(job_ids):
+        requeue_lost(spool, seen, main_dict['heartbeat_timeout'],
+                     main_dict['max_retries'])
+        for (job_id, data) in collect(spool, job_ids, results).items():
+            results[job_id] = data
+            print(f'{len(results)}/{len(job_ids)}: {data[0]} is finished.')
+        time.sleep(main_dict['heartbeat_timeout'] / 10)
+
+    return [results[job_id] for job_id in job_ids]
+
+
+def worker(main_dict: dict, exit_when_idle: bool = False) -> None:
+    '''
+    Takes jobs from the spool directory and processes them with
+    max_processes processes, until Ctrl+C is pressed.
+
+    Parameters
+    ----------
+    main_dict : dict
+        The dictionary which stores all constants for main.
+    exit_when_idle : bool, optional
+        Stop if there are no jobs any more. The default is False.
+
+    Returns
+    -------
+    None
+    '''
+    spool = main_dict['spool_dir']
+    name = f'{socket.gethostname()}-{os.getpid()}'
+    slots = main_dict['max_processes']
+    running = set()
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat,
+                     args=(spool, name, main_dict['heartbeat_timeout'] / 4,
+                           stop), daemon=True).start()
+    print(f'Worker {name} is waiting for jobs in {spool}.')
+
+    def done(job_id, job, data=None, error=None):
+        finish(spool, name, job_id, job, data, error,
+               main_dict['max_retries'])
+        running.discard(job_id)
+
+    with Pool(processes=slots, initializer=sub.ignore_interrupt) as pool:
+        try:
+            while True:
+                claimed = 0
+                while len(running) < slots:
+                    (job_id, job) = claim(spool, name)
+                    if job_id is None:
+                        break
+                    claimed += 1
+                    running.add(job_id)
+                    pool.apply_async(
+                        _run_job, job['args'],
+                        callback=lambda data, i=job_id, j=job: done(
+                            i, j, data=data),
+                        error_callback=lambda error, i=job_id, j=job: done(
+                            i, j, error=error))
+
+                if exit_when_idle and not claimed and not running:
+                    break
+                time.sleep(0.5)
+
+        except KeyboardInterrupt:
+            print('\nThe running jobs are finished.')
+            pool.close()
+            pool.join()
+
+        finally:
+            stop.set()
+            try:
+                os.rmdir(os.path.join(_dirs(spool)['running'], name))
+            except OSError:
+                pass
+
+
+def publish(spool: str, filenames: list, acc_dict: dict, gyr_dict: dict,
+            graph_dict: dict) -> list:
+    '''
+    Writes one job per file into spool/pending.
+
+    Returns
+    -------
+    job_ids : list
+        The names of the jobs in the order of filenames.
+    '''
+    dirs = _dirs(spool)
+    campaign = f'{time.strftime("%Y_%m_%d-%H_%M_%S")}-{os.getpid()}'
+    job_ids = []
+    for (n, filename) in enumerate(filenames):
+        job_id = f'{campaign}_{n:06d}'
+        job = {'attempt': 0,
+               'args': (filename, dict(acc_dict), dict(gyr_dict),
+                        dict(graph_dict))}
+        _write(os.path.join(dirs['pending'], job_id + '.job'), job)
+        job_ids.append(job_id)
+
+    return job_ids
+
+
+def collect(spool: str, job_ids: list, collected: set = frozenset()) -> dict:
+    '''
+    Reads the results and failures of the given jobs. The jobs in collected
+    have already been read and are skipped.
+
+    Returns
+    -------
+    results : dict
+        The result of processing.main for every newly finished job.
+    '''
+    dirs = _dirs(spool)
+    results = {}
+    for job_id in job_ids:
+        if job_id in collected:
+            continue
+        _path = os.path.join(dirs['done'], job_id + '.result')
+        if os.path.exists(_path):
+            results[job_id] = _read(_path)
+            continue
+
+        _path = os.path.join(dirs['failed'], job_id + '.error')
+        if os.path.exists(_path):
+            job = _read(_path)
+            print(f'{job["args"][0]} has failed: {job["error"]}')
+            results[job_id] = (job['args'][0], None, None, None, None)
+
+    return results
+
+
+def requeue_lost(spool: str, seen: dict, timeout: float,
+                 max_retries: int) -> None:
+    '''
+    Gives the jobs of workers without heartbeat back to pending.
+
+    Parameters
+    ----------
+    spool : str
+        The spool directory.
+    seen : dict
+        Last heartbeat of every worker and when it has been seen. It is
+        updated.
+    timeout : float
+        After how many seconds without a new heartbeat a worker is lost.
+    max_retries : int
+        How often a job is tried again.
+
+    Returns
+    -------
+    None
+    '''
+    dirs = _dirs(spool)
+    now = time.monotonic()
+    for name in os.listdir(dirs['running']):
+        try:
+            with open(os.path.join(dirs['workers'],
+                                   name + '.heartbeat')) as file:
+                beat = file.read()
+        except OSError:
+            beat = None
+
+        if name not in seen or seen[name][0] != beat:
+            seen[name] = (beat, now)
+            continue
+        if now - seen[name][1] < timeout:
+            continue
+
+        running = os.path.join(dirs['running'], name)
+        for job_file in os.listdir(running):
+            job = _read(os.path.join(running, job_file))
+            print(f'Worker {name} is lost, {job["args"][0]} is given to\
+ another worker.')
+            _retry(dirs, os.path.join(running, job_file), job_file, job,
+                   'worker lost', max_retries)
+        try:
+            os.rmdir(running)
+            os.remove(os.path.join(dirs['workers'], name + '.heartbeat'))
+        except OSError:
+            pass
+        del seen[name]
+
+
+def claim(spool: str, name: str) -> (str, dict):
+    '''
+    Takes the oldest pending job.
+
+    Returns
+    -------
+    job_id : str
+        The name of the job or None if there is no job.
+    job : dict
+        The job.
+    '''
+    dirs = _dirs(spool)
+    running = os.path.join(dirs['running'], name)
+    os.makedirs(running, exist_ok=True)
+    for job_file in sorted(os.listdir(dirs['pending'])):
+        if not job_file.endswith('.job'):
+            continue
+        try:
+            os.rename(os.path.join(dirs['pending'], job_file),
+                      os.path.join(running, job_file))
+        except FileNotFoundError:
+            continue
+        return (job_file[:-4], _read(os.path.join(running, job_file)))
+
+    return (None, None)
+
+
+def finish(spool: str, name: str, job_id: str, job: dict, data: tuple,
+           error: Exception, max_retries: int) -> None:
+    '''
+    Stores the result of a job, or gives it back to pending if it has
+    failed.
+    '''
+    dirs = _dirs(spool)
+    job_path = os.path.join(dirs['running'], name, job_id + '.job')
+    if not os.path.exists(job_path):
+#  The coordinator has given the job to another worker in the meantime.
+        print(f'{job["args"][0]} has already been given to another worker.')
+        if error is None:
+            _write(os.path.join(dirs['done'], job_id + '.result'), data)
+        return
+
+    if error is None:
+        _write(os.path.join(dirs['done'], job_id + '.result'), data)
+        os.remove(job_path)
+    else:
+        print(f'{job["args"][0]} has failed: {error!r}')
+        _retry(dirs, job_path, job_id + '.job', job, repr(error),
+               max_retries)
+
+
+def _retry(dirs: dict, job_path: str, job_file: str, job: dict, error: str,
+           max_retries: int) -> None:
+    '''
+    Gives a job back to pending, or to failed after max_retries attempts.
+    '''
+    job['attempt'] += 1
+    job['error'] = error
+    if job['attempt'] > max_retries:
+        _write(os.path.join(dirs['failed'], job_file[:-4] + '.error'), job)
+    else:
+        _write(os.path.join(dirs['pending'], job_file), job)
+    os.remove(job_path)
+
+
+def _run_job(filename: str, acc_dict: dict, gyr_dict: dict,
+             graph_dict: dict) -> tuple:
+    '''
+    Runs processing.main, graphs are only saved.
+    '''
+    if graph_dict['do_graph']:
+        graph_dict['save_graph'] = True
+        os.makedirs('saved_graphs', exist_ok=True)
+
+    return proces.main(filename, acc_dict, gyr_dict, graph_dict)
+
+
+def _write(_path: str, obj: object) -> None:
+    '''
+    Writes obj atomically: first to a temporary file which is then renamed.
+    '''
+    tmp_path = f'{_path}.{socket.gethostname()}-{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(obj, file)
+    os.replace(tmp_path, _path)
+
+
+def _read(_path: str) -> object:
+    '''
+    Reads a pickled file.
+    '''
+    with open(_path, 'rb') as file:
+        return pickle.load(file)
+
+
+def _heartbeat(spool: str, name: str, interval: float,
+               stop: threading.Event) -> None:
+    '''
+    Increases the heartbeat counter of a worker every interval seconds.
+    '''
+    _path = os.path.join(_dirs(spool)['workers'], name + '.heartbeat')
+    beat = 0
+    while not stop.is_set():
+        beat += 1
+        tmp_path = _path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            file.write(str(beat))
+        os.replace(tmp_path, _path)
+        stop.wait(interval)
+
+    if os.path.exists(_path):
+        os.remove(_path)
+
+
+def _dirs(spool: str) -> dict:
+    '''
+    Gives the folders of the spool directory and creates them.
+    '''
+    dirs = {name: os.path.join(spool, name)
+            for name in ['pending', 'running', 'done', 'failed', 'workers']}
+    for directory in dirs.values():
+        os.makedirs(directory, exist_ok=True)
+    return dirs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Distributed processing.')
+    parser.add_argument('role', choices=['coordinator', 'worker'])
+    parser.add_argument('--exit-when-idle', action='store_true',
+                        help='stop the worker if there are no jobs')
+    args = parser.parse_args()
+    (main_dict, acc_dict,
+     gyr_dict, graph_dict) = get_config(filename='config.ini')
+    if args.role == 'worker':
+        worker(main_dict, exit_when_idle=args.exit_when_idle)
+        sys.exit()
+
+    time_start = time.perf_counter()
+    if main_dict['filenames_auto']:
+        filenames = str_gen(main_dict['names'], main_dict['measurements'])
+    else:
+        filenames = main_dict['filenames']
+
+    data = coordinator(filenames, main_dict, acc_dict, gyr_dict, graph_dict)
+    if main_dict['save_output']:
+        data_storer(data, main_dict['save_formatter'],
+                    main_dict['save_format'],
+                    config_metadata(acc_dict, gyr_dict))
+    print(f'\nIt took {round(time.perf_counter() - time_start, 3)}s to run\
+ the program.')